@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# plint benchmark
+# Copyright (C) 2022-2023 Ben Trettel
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Times each stage of plint on synthetic claims and specifications of configurable size, writing one JSON object per line for each benchmark so that the results can be compared over time.
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import time
+
+import plint
+
+parser = argparse.ArgumentParser(description="plint benchmark: times each stage of plint on synthetic claims and specifications")
+parser.add_argument("-n", "--claims", help="number of claims; more than one number benchmarks each", type=int, nargs="+", default=[100])
+parser.add_argument("-i", "--independent", help="number of independent claims", type=int, default=3)
+parser.add_argument("-D", "--depth", help="longest chain of dependent claims", type=int, default=3)
+parser.add_argument("-V", "--vocabulary", help="number of different claim elements", type=int, default=200)
+parser.add_argument("-L", "--length", help="number of claim elements in each claim", type=int, default=5)
+parser.add_argument("-p", "--spec-paragraphs", help="number of paragraphs in the specification; 0 for no specification", type=int, default=100)
+parser.add_argument("-r", "--repeat", help="number of times to lint each set of claims; the fastest time of each stage is reported", type=int, default=3)
+parser.add_argument("--seed", help="seed for generating the claims and specification", type=int, default=0)
+parser.add_argument("--cache", action="store_true", help="use the claim cache, so that the repeats measure linting unchanged claims again", default=False)
+parser.add_argument("-o", "--output", help="append the results to this file instead of printing them", default=None)
+parser.add_argument("--save", help="also write the generated claims and specification to {save}-claims.txt and {save}-spec.txt for the largest number of claims", default=None)
+
+# Stages in the order plint runs them. The antecedent basis stage is the time of checking the claims other than reading the claims, the warnings file rules, and the marking.
+stages = ['title', 'spec_document', 'spec_definitions', 'parse', 'rules', 'marking', 'antecedent_basis', 'spec_elements', 'least_restrictive', 'restriction', 'attribute_time']
+
+consonants = 'bdfgklmnprstvz'
+vowels = 'aeiou'
+
+def make_word(rng):
+    # Made-up words, so that the claim elements rarely match the warnings file and the elements are easy to tell apart.
+    return ''.join(rng.choice(consonants)+rng.choice(vowels) for i in range(rng.randint(2, 4)))
+
+def make_vocabulary(rng, size):
+    # Claim elements of one or two words, all different. No element is the start of another element, which plint warns about.
+    words = set()
+    vocabulary = []
+    while len(vocabulary) < size:
+        if rng.random() < 0.3:
+            element = make_word(rng)+' '+make_word(rng)
+        else:
+            element = make_word(rng)
+        
+        if not(element.split(' ')[0] in words):
+            words.add(element.split(' ')[0])
+            vocabulary.append(element)
+    
+    return vocabulary
+
+def make_claims(rng, number_of_claims, number_of_indep_claims, depth, vocabulary, length):
+    # Claims in families, each an independent claim followed by its dependent claims. Each dependent claim depends on the claim before it, until a chain of depth dependent claims, after which the chain starts again at the independent claim.
+    # Dependent claims refer to elements introduced in the claims they depend on and introduce new elements.
+    number_of_indep_claims = max(1, min(number_of_indep_claims, number_of_claims))
+    family_sizes = [number_of_claims // number_of_indep_claims] * number_of_indep_claims
+    for i in range(number_of_claims % number_of_indep_claims):
+        family_sizes[i] += 1
+    
+    claims = []
+    claim_number = 0
+    for family_number, family_size in enumerate(family_sizes):
+        claim_number += 1
+        indep_claim_number = claim_number
+        
+        elements = rng.sample(vocabulary, min(length, len(vocabulary)))
+        
+        # The first independent claim is the shortest, as plint expects.
+        if family_number == 0:
+            elements = elements[0:max(1, length-1)]
+        
+        # Elements introduced in each claim of the family and the parent of each claim, by claim number.
+        introduced = {claim_number: elements}
+        parent_claims = {}
+        
+        if family_number % 2 == 0:
+            preamble = make_word(rng)
+            claim_text = "A {}| comprising: {}, wherein the {} is connected to the {}.".format(preamble, ', '.join('a '+element for element in elements), elements[0], elements[-1])
+        else:
+            preamble = 'method'
+            claim_text = "A method| comprising: {}, wherein the {} is connected to the {}.".format(', '.join('providing a '+element for element in elements), elements[0], elements[-1])
+        
+        claims.append("{}. {}".format(claim_number, claim_text))
+        
+        parent_claim = indep_claim_number
+        chain = 0
+        for i in range(family_size-1):
+            claim_number += 1
+            
+            if chain >= depth:
+                parent_claim = indep_claim_number
+                chain = 0
+            
+            parent_claims[claim_number] = parent_claim
+            
+            # Elements introduced in the claim this claim depends on and in its parent claims.
+            available = []
+            ancestor_claim = parent_claim
+            while not(ancestor_claim is None):
+                available.extend(introduced[ancestor_claim])
+                ancestor_claim = parent_claims.get(ancestor_claim)
+            
+            available_set = set(available)
+            new_elements = [element for element in rng.sample(vocabulary, min(len(vocabulary), 3*length)) if not(element in available_set)][0:max(1, length//2)]
+            old_elements = rng.sample(available, min(len(available), max(1, length-len(new_elements))))
+            introduced[claim_number] = new_elements
+            
+            claim_text = "The {} of claim {}, further comprising {}, wherein {}.".format(preamble, parent_claim, ', '.join('a '+element for element in new_elements), ', '.join('the {} is attached to the {}'.format(old_element, new_elements[0]) for old_element in old_elements))
+            claims.append("{}. {}".format(claim_number, claim_text))
+            
+            parent_claim = claim_number
+            chain += 1
+    
+    # Long claims are wrapped over several lines like in a claims file.
+    lines = []
+    for claim in claims:
+        words = claim.split(' ')
+        for i in range(0, len(words), 12):
+            lines.append(' '.join(words[i:i+12]))
+        lines.append('')
+    
+    return '\n'.join(lines)
+
+def make_spec(rng, number_of_paragraphs, vocabulary):
+    headings = ['TECHNICAL FIELD', 'BACKGROUND', 'SUMMARY', 'BRIEF DESCRIPTION OF THE DRAWINGS', 'DETAILED DESCRIPTION']
+    lines = []
+    for paragraph_number in range(number_of_paragraphs):
+        if paragraph_number % max(1, number_of_paragraphs // len(headings)) == 0:
+            lines.append(headings[min(len(headings)-1, paragraph_number // max(1, number_of_paragraphs // len(headings)))])
+        
+        sentences = []
+        for i in range(rng.randint(3, 6)):
+            element_1, element_2 = rng.sample(vocabulary, 2)
+            sentence = "The {} {} is coupled to the {} {}".format(element_1, rng.randint(100, 999), element_2, rng.randint(100, 999))
+            if rng.random() < 0.1:
+                sentence += ", e.g. in FIG. {}".format(rng.randint(1, 9))
+            sentences.append(sentence+'.')
+        
+        paragraph = ' '.join(sentences)
+        
+        # Paragraphs are wrapped over several lines.
+        words = paragraph.split(' ')
+        lines.append('    '+' '.join(words[0:15]))
+        for i in range(15, len(words), 15):
+            lines.append(' '.join(words[i:i+15]))
+        lines.append('')
+    
+    return '\n'.join(lines)
+
+def timed(timings, stage, function):
+    # Wraps function to add the time of each call to timings[stage].
+    def timed_function(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timings[stage] = timings.get(stage, 0) + time.perf_counter() - start
+    
+    return timed_function
+
+def timed_iterator(timings, stage, function):
+    # Wraps a function returning an iterator, like a generator, to add the time of getting each item to timings[stage].
+    def timed_function(*args, **kwargs):
+        iterator = iter(function(*args, **kwargs))
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                timings[stage] = timings.get(stage, 0) + time.perf_counter() - start
+            
+            yield item
+    
+    return timed_function
+
+def time_lint(linter, claims_text, spec_text, title):
+    # Returns the time of each stage of linting the claims.
+    timings = {}
+    
+    # The methods are wrapped on the instances only, so plint itself is not changed.
+    linter.check_title = timed(timings, 'title', plint.Linter.check_title.__get__(linter))
+    linter.check_spec_definitions = timed(timings, 'spec_definitions', plint.Linter.check_spec_definitions.__get__(linter))
+    linter.split_claims = timed_iterator(timings, 'parse', plint.Linter.split_claims.__get__(linter))
+    linter.check_claims = timed(timings, 'check_claims', plint.Linter.check_claims.__get__(linter))
+    linter.mark_claim_text = timed(timings, 'marking', plint.Linter.mark_claim_text.__get__(linter))
+    linter.warnings.search = timed(timings, 'rules', plint.RuleEngine.search.__get__(linter.warnings))
+    linter.check_spec_elements = timed(timings, 'spec_elements', plint.Linter.check_spec_elements.__get__(linter))
+    linter.check_least_restrictive = timed(timings, 'least_restrictive', plint.Linter.check_least_restrictive.__get__(linter))
+    linter.check_restriction = timed(timings, 'restriction', plint.Linter.check_restriction.__get__(linter))
+    linter.check_attribute_time = timed(timings, 'attribute_time', plint.Linter.check_attribute_time.__get__(linter))
+    
+    start = time.perf_counter()
+    
+    if spec_text is None:
+        spec = None
+    else:
+        spec = timed(timings, 'spec_document', plint.SpecDocument)(spec_text)
+    
+    result = linter.lint(claims_text, spec=spec, title=title, output=plint.OutputSink())
+    
+    timings['total'] = time.perf_counter() - start
+    
+    # The claims are read as they are checked, so the time of reading them is part of the time of checking the claims.
+    timings['antecedent_basis'] = timings.pop('check_claims', 0) - timings.get('parse', 0) - timings.get('rules', 0) - timings.get('marking', 0)
+    
+    return timings, result
+
+def main():
+    args = parser.parse_args()
+    
+    if args.output is None:
+        output = sys.stdout
+    else:
+        output = open(args.output, 'a')
+    
+    # plint prints the number of warnings loaded and similar messages, which are not part of the results.
+    with contextlib.redirect_stdout(io.StringIO()):
+        plint_args = plint.parser.parse_args([])
+        linter_options = {'nitpick': True, 'no_cache': not(args.cache)}
+    
+    for number_of_claims in args.claims:
+        rng = random.Random(args.seed)
+        vocabulary = make_vocabulary(rng, args.vocabulary)
+        claims_text = make_claims(rng, number_of_claims, args.independent, args.depth, vocabulary, args.length)
+        
+        if args.spec_paragraphs > 0:
+            spec_text = make_spec(rng, args.spec_paragraphs, vocabulary)
+        else:
+            spec_text = None
+        
+        title = "Apparatus and method for coupling a {}".format(vocabulary[0])
+        
+        if not(args.save is None) and (number_of_claims == max(args.claims)):
+            with open(args.save+'-claims.txt', 'w') as f:
+                f.write(claims_text)
+            
+            if not(spec_text is None):
+                with open(args.save+'-spec.txt', 'w') as f:
+                    f.write(spec_text)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            linter = plint.Linter(plint_args, **linter_options)
+        
+        fastest = {}
+        for i in range(args.repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                timings, result = time_lint(linter, claims_text, spec_text, title)
+            
+            for stage in timings:
+                fastest[stage] = min(fastest.get(stage, timings[stage]), timings[stage])
+        
+        record = {
+            'plint_version': plint.plint_version,
+            'python_version': platform.python_version(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'parameters': {'claims': number_of_claims, 'independent': args.independent, 'depth': args.depth, 'vocabulary': args.vocabulary, 'length': args.length, 'spec_paragraphs': args.spec_paragraphs, 'repeat': args.repeat, 'seed': args.seed, 'cache': args.cache},
+            'size': {'claims_characters': len(claims_text), 'spec_characters': 0 if spec_text is None else len(spec_text), 'warnings': result.number_of_warnings()},
+            'seconds': dict((stage, round(fastest.get(stage, 0), 6)) for stage in stages+['total']),
+        }
+        
+        print(json.dumps(record), file=output)
+        output.flush()
+    
+    if not(args.output is None):
+        output.close()
+
+if __name__ == "__main__":
+    main()
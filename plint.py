@@ -18,74 +18,604 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import argparse
+import bisect
 import csv
 import sys
 import os
 import re
 import copy
-from itertools import chain, combinations
+import io
+import glob
+import contextlib
+import multiprocessing
+from itertools import combinations
 import json
+import hashlib
+import time
+import urllib.parse
+import signal
+import threading
+
+# The parser of the re module, used to find the words that rules require. It was renamed in Python 3.11.
+try:
+    import re._parser as sre_parse
+except ImportError:
+    import sre_parse
+
+plint_version = "0.32.2"
+
+def positive_int(value):
+    # Type of the command line arguments that must be at least 1.
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("not a whole number: {}".format(value))
+    
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1: {}".format(value))
+    
+    return number
 
 parser = argparse.ArgumentParser(description="patent claim proofreader and analyzer: checks patent claims for antecedent basis, 112(b), 112(d), 112(f), restrictions, and other issues")
 parser.add_argument("claims", help="claims file to read", nargs='?', default=None)
 parser.add_argument("-a", "--ant-basis", action="store_true", help="check for antecedent basis issues", default=False)
+parser.add_argument("-b", "--batch", help="lint every claims file and JSON input file in this directory or matching this glob, writing the output for each to {file}.out", default=None)
 #parser.add_argument("-A", "--abstract", help="document abstract for analysis")
 parser.add_argument("-c", "--to-claim", help="stop analysis at this claim number", type=int, default=None)
+parser.add_argument("--claim-cache", action="store_true", help="keep the results of checking and marking each claim on disk, so that the next run on the same claims file only checks the claims that changed", default=False)
 parser.add_argument("-C", "--claims-warnings", help="claims warnings file to read", default=None)
 parser.add_argument("-d", "--debug", action="store_true", help="print debugging information; automatically enables verbose flag", default=False)
 parser.add_argument("-e", "--endings", action="store_true", help="give warnings for likely adverbs (words ending in -ly) and present participle phrases (words ending in -ing)", default=False)
 parser.add_argument("-f", "--filter", help="filter out warnings with this regex", nargs="*", default=[])
+parser.add_argument("--format", help="format of the warnings: text (default), jsonl for one JSON object per line, or sarif", choices=['text', 'jsonl', 'sarif'], default=None)
 parser.add_argument("-F", "--force", action="store_true", help="enable all commented out warnings", default=False)
+parser.add_argument("-j", "--jobs", help="number of worker processes to use: in batch mode, for the files (defaults to the number of CPUs), otherwise for the independent claim families of the claims file (defaults to 1)", type=positive_int, default=None)
 parser.add_argument("-l", "--legal", action="store_true", help="show legal notices", default=False)
 parser.add_argument("-m", "--manual-marking", action="store_true", help="don't automatically mark previously introduced claim elements", default=False)
 #parser.add_argument("-N", "--no-auto-mark", help="don't use automatic marking on these claim elements", default=[])
+parser.add_argument("--no-cache", action="store_true", help="don't read or write the cache of loaded warnings files", default=False)
 parser.add_argument("-n", "--nitpick", action="store_true", help="equivalent to --ant-basis --restriction --endings --uspto", default=False)
 parser.add_argument("-o", "--outfile", action="store_true", help="output warnings to {file}.out", default=False)
+parser.add_argument("--profile", help="time each stage of linting and each warnings file rule, print the slowest rules, and write a JSON report to PROFILE (default: {file}.profile.json, or plint-profile.json in batch mode); turns off the claim cache and --jobs for the claims", nargs='?', const='', default=None)
 parser.add_argument("-r", "--restriction", action="store_true", help="analyze claims for restriction; automatically enables --ant-basis flag", default=False)
+parser.add_argument("--rule-time-limit", help="skip a warnings file rule for the rest of the lint if checking it on one claim or title takes longer than this many seconds (default: 1 for a warnings file given with -C, no limit for the bundled warnings files; 0 for no limit); only on Unix", type=float, default=None)
+parser.add_argument("--server", action="store_true", help="run a language server on stdin and stdout for editors, linting the documents sent by the editor with the other flags given", default=False)
 parser.add_argument("-s", "--spec", help="specification text file to read")
+parser.add_argument("--spec-ignore-case", action="store_true", help="ignore case when counting the appearances of claim elements in the spec", default=False)
+parser.add_argument("--spec-whole-words", action="store_true", help="only count appearances of claim elements in the spec that are whole words", default=False)
 parser.add_argument("-t", "--title", help="document title for analysis")
 parser.add_argument("-U", "--uspto", action="store_true", help="USPTO examiner mode: display messages relevant to USPTO patent examiners", default=False)
-parser.add_argument("-v", "--version", action="version", version="plint version 0.32.2")
+parser.add_argument("-v", "--version", action="version", version="plint version {}".format(plint_version))
 parser.add_argument("-V", "--verbose", action="store_true", help="print additional information", default=False)
+parser.add_argument("--watch", action="store_true", help="keep running and lint again whenever the claims file, the spec, or the JSON input file changes", default=False)
 parser.add_argument("--test", action="store_true", help=argparse.SUPPRESS, default=False)
-args = parser.parse_args()
+
+file_ext = '.csv'
+
+terms_that_should_not_be_in_claim_element = {r'\bclaim\b', r'\bcomprising\b', r'\bcomprises\b', r'\bconsisting of\b', r'\bconsisting essentially of\b', r'\bwherein\b', r'\bwhereby\b'}
+long_claim_element_limit = 100
+
+# MPEP sections cited in warnings, for example "2173.05(b)(III)" in "See MPEP 2173.05(b)(III)."
+mpep_regex = re.compile(r"\bMPEP (\d+(?:\.\d+)?(?:\([A-Za-z0-9]+\))*(?:\.[IVX]+(?:\.[A-Z]\b)?)?)")
+
+# Formats of the warnings from the warnings files.
+claim_warning_format = 'Claim {} recites "{}". {}'
+title_warning_format = 'Title recites "{}". {}'
+
+# Plural claim element starting terms, marked by Linter.mark_claim_text.
+plural_starting_terms = {'at least one', 'one or more', 'more than one', 'two or more', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten'}
+plural_starting_term_regex = re.compile(r"(?<!\bthe )(?<!\bsaid )(?<![\[{#])\b(?=(?:" + "|".join(sorted(plural_starting_terms, key=lambda term: (-len(term), term))) + r")\b)", flags=re.IGNORECASE)
+
+# Abbreviations that don't end a sentence in the spec.
+abbreviations = {'e.g.', 'i.e.', 'fig.', 'figs.', 'no.', 'nos.', 'ser.', 'pat.', 'u.s.', 'al.', 'cf.', 'viz.', 'vs.', 'approx.', 'ref.', 'refs.'}
+sentence_end_regex = re.compile(r"(\S*\.)\s+")
+
+# Terms that could indicate a lexicographic definition in the spec.
+lexicographic_definition_regex = re.compile(r"(“|”|\bi\.e\.|\b,\sthat\sis\b|\bmeaning\b|\bmeans(?!\sfor|\sto)\b|\bdefinitions?\b|\bdefines?\b|\bdefined\b|\bdefining\b|\bterms?\b|\btermed\b|\bterminology\b|\bphrases?\b|\bin\sother\swords\b|\bknown\sas\b|\bcalled\b|\bnamed\b|\bso.called\b|\bsimply\sput\b|\bput\sdifferently\b|\bthat\sis\sto\ssay\b|\bnamely\b|\botherwise\sstated\b|\bin\sshort\b|\balternatively\sstated\b|\bput\sit\sdifferently\b|\bidentified\b|\breferred\sto\sas\b|\bdesignated\b|\bas\sused\sherein\b|\bas\sused\shere\b|\bas\sopposed\sto\b|\bis\sunderstood\sto\smean\b|\bis\sunderstood\sherein\b|\bconstrued\b|\bfor\sexample\b|\be\.g\.)", flags=re.IGNORECASE)
+
+def is_word_char(char):
+    # Same as \w in a regex.
+    return char.isalnum() or (char == '_')
 
 # <https://stackoverflow.com/a/14981125/1124489>
 def eprint(*args, **kwargs):
-    if not(use_outfile):
-        print(*args, file=sys.stderr, **kwargs)
+    print(*args, file=sys.stderr, **kwargs)
+
+def re_matches(regex, text):
+    match = re.search(regex, text, flags=re.IGNORECASE)
+    if match is None:
+        return False, None
     else:
-        with open(outfile, 'a') as f:
-            print(*args, file=f, **kwargs)
-
-def warn(message, dav_keyword=None):
-    global number_of_warnings
-    global dav_keywords
-    if rule_filters is None:
-        eprint(message)
-        number_of_warnings += 1
+        return True, match.group()
+
+# Characters other than ASCII letters that match ASCII letters when the re module ignores case, mapped to the letters they match.
+ascii_case_folding = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's', '\u212a': 'k'})
+
+word_regex = re.compile(r"\w+")
+ascii_word_regex = re.compile(r"[a-z0-9_]+")
+
+# The most texts that a rule can match for the words the rule requires to be found.
+max_rule_texts = 256
+
+def rule_texts(pattern):
+    # Returns the set of texts that a parsed regex pattern can match, or None if there are too many texts or they can't be listed, for example with "+", "." or "\w".
+    # Whitespace and word boundaries are both given as a space, and lookarounds as an empty string, as only the words in the texts are used.
+    texts = {''}
+    for op, av in pattern:
+        if op is sre_parse.LITERAL:
+            item_texts = {chr(av)}
+        elif op is sre_parse.IN:
+            item_texts = set()
+            for in_op, in_av in av:
+                if in_op is sre_parse.LITERAL:
+                    item_texts.add(chr(in_av))
+                elif (in_op is sre_parse.CATEGORY) and (in_av is sre_parse.CATEGORY_SPACE):
+                    item_texts.add(' ')
+                else:
+                    return None
+        elif op is sre_parse.AT:
+            if av is sre_parse.AT_BOUNDARY:
+                item_texts = {' '}
+            else:
+                item_texts = {''}
+        elif (op is sre_parse.ASSERT) or (op is sre_parse.ASSERT_NOT):
+            item_texts = {''}
+        elif op is sre_parse.SUBPATTERN:
+            group, add_flags, del_flags, subpattern = av
+            if add_flags & sre_parse.SRE_FLAG_ASCII:
+                return None
+            
+            item_texts = rule_texts(subpattern)
+        elif op is sre_parse.BRANCH:
+            item_texts = set()
+            for branch in av[1]:
+                branch_texts = rule_texts(branch)
+                if branch_texts is None:
+                    return None
+                
+                item_texts.update(branch_texts)
+        elif (op is sre_parse.MAX_REPEAT) or (op is sre_parse.MIN_REPEAT):
+            min_count, max_count, subpattern = av
+            if max_count > 3:
+                return None
+            
+            repeated_texts = rule_texts(subpattern)
+            if repeated_texts is None:
+                return None
+            
+            item_texts = set()
+            count_texts = {''}
+            for count in range(max_count+1):
+                if count >= min_count:
+                    item_texts.update(count_texts)
+                
+                count_texts = {text+repeated_text for text in count_texts for repeated_text in repeated_texts}
+        else:
+            return None
+        
+        if item_texts is None:
+            return None
+        
+        texts = {text+item_text for text in texts for item_text in item_texts}
+        if len(texts) > max_rule_texts:
+            return None
+    
+    return texts
+
+def texts_words(texts):
+    # Returns a set of words, one from each text, that appear as whole words in the text, or None if a text has no whole word.
+    # The start and the end of a text are not word boundaries, as the text can be part of a longer match.
+    words = set()
+    for text in texts:
+        text_words = []
+        for match in word_regex.finditer(text):
+            if (match.start() > 0) and (match.end() < len(text)) and ascii_word_regex.fullmatch(match.group().lower()):
+                text_words.append(match.group().lower())
+        
+        if len(text_words) == 0:
+            return None
+        
+        # Longer words are usually rarer.
+        words.add(max(text_words, key=len))
+    
+    return words
+
+def better_words(words, other_words):
+    # The set of required words that selects fewer rules, going by the length of the shortest word and then by the number of words.
+    if words is None:
+        return other_words
+    elif other_words is None:
+        return words
+    elif (min(len(word) for word in other_words), -len(other_words)) > (min(len(word) for word in words), -len(words)):
+        return other_words
     else:
-        display_warning = True
-        for rule_filter in rule_filters:
-            if re.search(rule_filter, message, flags=re.IGNORECASE):
-                display_warning = False
-        if display_warning:
-            eprint(message)
-            number_of_warnings += 1
+        return words
+
+def pattern_words(pattern):
+    # Returns a set of words one of which appears as a whole word in any text that a parsed regex pattern matches, or None if no such words were found.
+    # The pattern is split into the parts whose texts can be listed, and the best words of any part or of any repeated group are used.
+    words = None
+    part = []
+    for item in list(pattern)+[None]:
+        if not(item is None) and not(rule_texts([item]) is None):
+            part.append(item)
+            continue
+        
+        if len(part) > 0:
+            part_texts = rule_texts(part)
+            if not(part_texts is None):
+                words = better_words(words, texts_words(part_texts))
             
-            if not(dav_keyword is None) and not(dav_keyword in dav_keywords):
-                dav_keywords.add(dav_keyword)
+            part = []
+        
+        if item is None:
+            continue
+        
+        op, av = item
+        if op is sre_parse.SUBPATTERN:
+            words = better_words(words, pattern_words(av[3]))
+        elif op is sre_parse.BRANCH:
+            branch_words = set()
+            for branch in av[1]:
+                words_of_branch = pattern_words(branch)
+                if words_of_branch is None:
+                    branch_words = None
+                    break
+                
+                branch_words.update(words_of_branch)
+            
+            words = better_words(words, branch_words)
+        elif ((op is sre_parse.MAX_REPEAT) or (op is sre_parse.MIN_REPEAT)) and (av[0] >= 1):
+            words = better_words(words, pattern_words(av[2]))
+    
+    return words
 
-def assert_warn(bool_input, message, dav_keyword=None):
-    if not bool_input:
-        warn(message, dav_keyword=dav_keyword)
+def rule_words(regex):
+    # Returns a set of words one of which appears as a whole word, ignoring case, in any text that the regex matches, or None if there are no such words, in which case the rule has to be checked on every text.
+    # For example, the words of "\b(only|also|just)\b" are "only", "also", and "just".
+    try:
+        pattern = sre_parse.parse(regex, re.IGNORECASE)
+    except Exception:
+        return None
+    
+    # With the ASCII flag, "\b" is not a word boundary for the words of text_words().
+    if pattern.state.flags & sre_parse.SRE_FLAG_ASCII:
+        return None
+    
+    return pattern_words(pattern)
 
-def re_matches(regex, text):
-    if re.search(regex, text, flags=re.IGNORECASE) is None:
-        return False, None
+def text_words(text):
+    # The words of the text in lowercase, with the characters that match ASCII letters when ignoring case replaced by those letters, so that the words can be compared against the words of rule_words().
+    if not(text.isascii()):
+        text = text.translate(ascii_case_folding)
+    
+    return set(word.lower() for word in word_regex.findall(text))
+
+# Repeats allowing more than this many repetitions are treated like "*" and "+" when looking for regexes that can take exponential time.
+max_small_repeat = 10
+
+# Characters that the character classes of a regex are tried on when checking whether two character classes overlap.
+sample_chars = [chr(code) for code in range(128)] + ['\u00a0', '\u00e9', '\u0660', '\u2003']
+
+def min_match_length(pattern):
+    # The length of the shortest text that a parsed regex pattern can match, counting group references and anything unusual as 0.
+    length = 0
+    for op, av in pattern:
+        if op in (sre_parse.LITERAL, sre_parse.NOT_LITERAL, sre_parse.ANY, sre_parse.IN):
+            length += 1
+        elif op is sre_parse.SUBPATTERN:
+            length += min_match_length(av[3])
+        elif op is sre_parse.BRANCH:
+            length += min(min_match_length(branch) for branch in av[1])
+        elif (op is sre_parse.MAX_REPEAT) or (op is sre_parse.MIN_REPEAT):
+            length += av[0] * min_match_length(av[2])
+    
+    return length
+
+def is_large_repeat(op, av):
+    return ((op is sre_parse.MAX_REPEAT) or (op is sre_parse.MIN_REPEAT)) and (av[1] > max_small_repeat)
+
+def repeat_can_follow_itself(pattern):
+    # Whether a parsed regex pattern, when repeated, can match a large repeat directly after the same large repeat, for example "(a+)+" or "(\w+\s?)*". The text matched by the large repeats can then be split between the repetitions in exponentially many ways.
+    for item_index, (op, av) in enumerate(pattern):
+        if min_match_length(pattern[0:item_index]) + min_match_length(pattern[item_index+1:]) > 0:
+            continue
+        
+        if is_large_repeat(op, av):
+            return True
+        elif op is sre_parse.SUBPATTERN:
+            if repeat_can_follow_itself(av[3]):
+                return True
+        elif op is sre_parse.BRANCH:
+            if any(repeat_can_follow_itself(branch) for branch in av[1]):
+                return True
+        elif (op is sre_parse.MAX_REPEAT) or (op is sre_parse.MIN_REPEAT):
+            if repeat_can_follow_itself(av[2]):
+                return True
+    
+    return False
+
+def category_matches(category, char):
+    # Whether a character is in a category of a regex character class, for example "\d".
+    if category is sre_parse.CATEGORY_DIGIT:
+        return char.isdecimal()
+    elif category is sre_parse.CATEGORY_NOT_DIGIT:
+        return not(char.isdecimal())
+    elif category is sre_parse.CATEGORY_SPACE:
+        return char.isspace()
+    elif category is sre_parse.CATEGORY_NOT_SPACE:
+        return not(char.isspace())
+    elif category is sre_parse.CATEGORY_WORD:
+        return is_word_char(char)
+    elif category is sre_parse.CATEGORY_NOT_WORD:
+        return not(is_word_char(char))
     else:
-        match_str = re.search(regex, text, flags=re.IGNORECASE).group()
-        return True, match_str
+        return True
+
+def char_item_chars(op, av):
+    # The characters of sample_chars that one item of a parsed regex pattern matching a single character matches, ignoring case, or None if the item does not match a single character.
+    chars = set()
+    for char in sample_chars:
+        if op is sre_parse.LITERAL:
+            matches = (char.lower() == chr(av).lower())
+        elif op is sre_parse.NOT_LITERAL:
+            matches = (char.lower() != chr(av).lower())
+        elif op is sre_parse.ANY:
+            matches = (char != '\n')
+        elif op is sre_parse.IN:
+            matches = False
+            negate = False
+            for in_op, in_av in av:
+                if in_op is sre_parse.NEGATE:
+                    negate = True
+                elif in_op is sre_parse.LITERAL:
+                    matches = matches or (char.lower() == chr(in_av).lower())
+                elif in_op is sre_parse.RANGE:
+                    matches = matches or (in_av[0] <= ord(char.lower()) <= in_av[1]) or (in_av[0] <= ord(char.upper()) <= in_av[1])
+                elif in_op is sre_parse.CATEGORY:
+                    matches = matches or category_matches(in_av, char)
+            
+            matches = (matches != negate)
+        else:
+            return None
+        
+        if matches:
+            chars.add(char)
+    
+    return chars
+
+def overlapping_alternatives(pattern):
+    # Whether a parsed regex pattern is an alternation with two alternatives matching the same single character, for example "(.|\s)" or "(\w|\d)". Repeating such an alternation can take exponential time.
+    while (len(pattern) == 1) and (pattern[0][0] is sre_parse.SUBPATTERN):
+        pattern = pattern[0][1][3]
+    
+    if (len(pattern) != 1) or not(pattern[0][0] is sre_parse.BRANCH):
+        return False
+    
+    branch_chars = []
+    for branch in pattern[0][1][1]:
+        while (len(branch) == 1) and (branch[0][0] is sre_parse.SUBPATTERN):
+            branch = branch[0][1][3]
+        
+        if len(branch) == 1:
+            chars = char_item_chars(branch[0][0], branch[0][1])
+            if not(chars is None):
+                for other_chars in branch_chars:
+                    if len(chars & other_chars) > 0:
+                        return True
+                
+                branch_chars.append(chars)
+    
+    return False
+
+def pattern_backtracking(pattern):
+    # Returns why a parsed regex pattern could take exponential time to check, or None.
+    for op, av in pattern:
+        if is_large_repeat(op, av):
+            if repeat_can_follow_itself(av[2]):
+                return "nested repeats"
+            
+            if overlapping_alternatives(av[2]):
+                return "repeated alternatives matching the same character"
+        
+        if op is sre_parse.SUBPATTERN:
+            subpatterns = [av[3]]
+        elif op is sre_parse.BRANCH:
+            subpatterns = av[1]
+        elif (op is sre_parse.MAX_REPEAT) or (op is sre_parse.MIN_REPEAT):
+            subpatterns = [av[2]]
+        elif (op is sre_parse.ASSERT) or (op is sre_parse.ASSERT_NOT):
+            subpatterns = [av[1]]
+        else:
+            subpatterns = []
+        
+        for subpattern in subpatterns:
+            reason = pattern_backtracking(subpattern)
+            if not(reason is None):
+                return reason
+    
+    return None
+
+def rule_backtracking(regex):
+    # Returns why a regex could take exponential time to check because of catastrophic backtracking, for example "(a+)+b" on a long text of "a"s, or None if no such problem was found.
+    # Only the usual causes are found, so the time that any one rule takes is also limited while checking (see RuleTimer).
+    try:
+        pattern = sre_parse.parse(regex, re.IGNORECASE)
+    except Exception:
+        return None
+    
+    return pattern_backtracking(pattern)
+
+class RuleTimeout(Exception):
+    pass
+
+class RuleTimer:
+    # Stops a rule that takes longer than time_limit seconds on one text by raising RuleTimeout, using SIGALRM, which the re module checks for while matching.
+    # SIGALRM is only available on Unix and in the main thread. Elsewhere, or if time_limit is None or 0, the rules are not timed.
+    # One timer runs while all of the rules are checked on a text. When the timer goes off, the rule being checked is only stopped if the rule alone has taken the time limit. Otherwise, the timer is set for the rest of the time limit of the rule.
+    
+    def __init__(self, time_limit):
+        self.time_limit = time_limit
+        self.enabled = bool(time_limit) and hasattr(signal, 'setitimer') and (threading.current_thread() is threading.main_thread())
+        self.rule_start = None
+    
+    def __enter__(self):
+        if self.enabled:
+            self.previous_handler = signal.signal(signal.SIGALRM, self.alarm)
+            signal.setitimer(signal.ITIMER_REAL, self.time_limit)
+        
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.enabled:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            
+            # The previous handler is None if it was not set from Python.
+            if self.previous_handler is None:
+                self.previous_handler = signal.SIG_DFL
+            
+            signal.signal(signal.SIGALRM, self.previous_handler)
+    
+    def start_rule(self):
+        self.rule_start = time.perf_counter()
+    
+    def stop_rule(self):
+        self.rule_start = None
+    
+    def alarm(self, signum, frame):
+        if self.rule_start is None:
+            signal.setitimer(signal.ITIMER_REAL, self.time_limit)
+            return
+        
+        elapsed = time.perf_counter() - self.rule_start
+        if elapsed < self.time_limit:
+            signal.setitimer(signal.ITIMER_REAL, self.time_limit - elapsed)
+        else:
+            raise RuleTimeout()
+
+class RuleEngine:
+    # Holds the rules of a warnings file compiled once, so that checking a claim does not depend on the re module's internal cache, which a warnings file with hundreds of rules can overflow.
+    
+    def __init__(self, warnings, name='warnings'):
+        self.warnings = warnings
+        self.rules = []
+        
+        # The ID of each rule is the name of the warnings file and the line number of the rule in the warnings file, for example "claims.csv:12", or the number of the rule if the line number is unknown.
+        self.rule_ids = []
+        
+        # An index from each word to the rules requiring the word, so that only the rules whose words are in a text are checked. The rules without required words are checked on every text.
+        self.rules_by_word = {}
+        self.unindexed_rules = []
+        
+        # The rules that are not checked because they could take exponential time to check, by index, with the reason. The Linter reports them.
+        self.skipped_rules = {}
+        
+        # Hash of the rules, which changes if any rule changes.
+        self.digest = hashlib.sha256(json.dumps([[warning['regex'], warning['message']] for warning in warnings]).encode('utf-8')).hexdigest()
+        
+        for rule_index, warning in enumerate(warnings):
+            self.rule_ids.append('{}:{}'.format(name, warning.get('line', rule_index+1)))
+            
+            # Warnings containing "112(d)" or "DEPONLY" only apply to dependent claims.
+            dependent_only = ('112(d)' in warning['message']) or ('DEPONLY' in warning['message'])
+            
+            # All text after "#" in the message is a comment.
+            message = warning['message'].split('#')[0].strip()
+            
+            self.rules.append((re.compile(warning['regex'], flags=re.IGNORECASE), message, dependent_only))
+            
+            if 'words' in warning:
+                words = warning['words']
+            else:
+                words = rule_words(warning['regex'])
+            
+            if words is None:
+                self.unindexed_rules.append(rule_index)
+            else:
+                for word in words:
+                    self.rules_by_word.setdefault(word, []).append(rule_index)
+            
+            if 'backtracking' in warning:
+                backtracking = warning['backtracking']
+            else:
+                backtracking = rule_backtracking(warning['regex'])
+            
+            if not(backtracking is None):
+                self.skipped_rules[rule_index] = "could take exponential time to check ({})".format(backtracking)
+    
+    def __len__(self):
+        return len(self.rules)
+    
+    def suppressed_rules(self, filter_regexes, warning_format):
+        # Returns the indices of the rules whose warnings are always filtered out, going by the message of the rule alone, so that these rules can be skipped before searching the text or formatting the warning.
+        # The message is searched in the context it has in the warning formatted with warning_format, but only matches starting in the message itself count as the rest of the warning changes.
+        prefix = warning_format.format('', '', '')
+        
+        suppressed_rules = set()
+        for rule_index, (compiled_regex, message, dependent_only) in enumerate(self.rules):
+            for filter_regex in filter_regexes:
+                if filter_regex.search(prefix+message, len(prefix)):
+                    suppressed_rules.add(rule_index)
+                    break
+        
+        return suppressed_rules
+    
+    def matches(self, text, dependent=True, debug=False, skip=()):
+        # Returns (matched text, message) for every rule matching the text, in the order of the warnings file. The rules with indices in skip are not checked.
+        return [(match.group(), message) for rule_id, match, message in self.search(text, dependent=dependent, debug=debug, skip=skip)]
+    
+    def search(self, text, dependent=True, debug=False, skip=(), profiler=None, time_limit=None, timed_out_rules=None):
+        # Same as matches(), but returns (rule ID, match object, message). With a Profiler, the time each rule takes is recorded.
+        # With a time limit, a rule taking longer than time_limit seconds on the text is stopped and doesn't match. See RuleTimer.
+        # The rules stopped are added to the dictionary timed_out_rules, if given, by rule ID with the regex, and the rules already in it are skipped. The Linter keeps one for each lint.
+        # Only the rules that could match are checked: the rules requiring a word in the text and the rules without required words.
+        candidate_rules = set(self.unindexed_rules)
+        for word in text_words(text):
+            candidate_rules.update(self.rules_by_word.get(word, ()))
+        
+        matched_rules = []
+        with RuleTimer(time_limit) as rule_timer:
+            for rule_index in sorted(candidate_rules):
+                compiled_regex, message, dependent_only = self.rules[rule_index]
+                
+                if debug:
+                    print("Trying regex:", compiled_regex.pattern)
+                
+                # For independent claims, skip warnings that only apply to dependent claims.
+                if dependent_only and not(dependent):
+                    continue
+                
+                if (rule_index in skip) or (rule_index in self.skipped_rules):
+                    continue
+                
+                if not(timed_out_rules is None) and (self.rule_ids[rule_index] in timed_out_rules):
+                    continue
+                
+                if not(profiler is None):
+                    start = time.perf_counter()
+                
+                try:
+                    rule_timer.start_rule()
+                    match = compiled_regex.search(text)
+                    rule_timer.stop_rule()
+                except RuleTimeout:
+                    rule_timer.stop_rule()
+                    match = None
+                    if not(timed_out_rules is None):
+                        timed_out_rules[self.rule_ids[rule_index]] = compiled_regex.pattern
+                
+                if not(profiler is None):
+                    profiler.record_rule(self.rule_ids[rule_index], time.perf_counter() - start, not(match is None))
+                
+                if not(match is None):
+                    matched_rules.append((self.rule_ids[rule_index], match, message))
+        
+        return matched_rules
+
+
+def compile_filters(filters):
+    # Compiles the regexes used to filter out warnings once. Each regex is compiled on its own, as combining them into one regex would renumber their groups and break backreferences.
+    return [re.compile(rule_filter, flags=re.IGNORECASE) for rule_filter in filters]
 
 def remove_punctuation(text):
     return text.replace(',', '').replace(';', '').replace('.', '')
@@ -94,18 +624,9 @@ def remove_ab_notation(text):
     # Remove marking characters
     text = text.replace('{', '').replace('}', '').replace('[', '').replace(']', '').replace('#', '').replace('|', '').replace('!', '')
     
-    # Remove text added for antecedent basis checking only.
+    # Remove text added for antecedent basis checking only. That text is in every other part of the text when split at the '`' characters.
     assert (text.count("`") % 2) == 0, "Unclosed '`' detected in claim marking, aborting."
-    loc = 0
-    print_text = True
-    cleaned_text = ""
-    while loc < len(text):
-        if text[loc] == "`":
-            print_text = not(print_text)
-        elif print_text:
-            cleaned_text += text[loc]
-        
-        loc += 1
+    cleaned_text = "".join(text.split("`")[0::2])
     assert not("`" in cleaned_text), "Somehow a '`' character survived the cleaning."
     
     # Remove unnecessary spaces
@@ -116,90 +637,52 @@ def remove_ab_notation(text):
 def bracket_error_str(claim_number, message, loc, claim_text):
     return 'Claim {}: {}. At index {} with text "{}":\n{}'.format(claim_number, message, loc, claim_text[loc-5:loc+5], claim_text[0:loc]+'*****'+claim_text[loc:])
 
-def mark_new_element_punctuation(claim_text, claim_number):
+def mark_element_punctuation(claim_text, claim_number, start_bracket, end_bracket, bracket_name):
+    # Ends the claim elements started with start_bracket at punctuation, '|', or the end of the claim, handling '~' and '!'.
+    # The marked claim is built up in a list in a single pass over the claim text rather than by modifying the claim text in place.
+    marked_text = []
+    in_bracket = False
     loc = 0
-    curly_bracket = False
     while loc < len(claim_text):
         char = claim_text[loc]
         
         if (char == ',') or (char == ';') or (char == ':'):
-            if claim_text[loc+1] != '~':
-                if curly_bracket:
-                    claim_text = claim_text[0:loc]+"}"+claim_text[loc:]
-                    curly_bracket = False
-                    loc += 1
+            if claim_text[loc+1:loc+2] != '~':
+                if in_bracket:
+                    marked_text.append(end_bracket)
+                    in_bracket = False
+                marked_text.append(char)
             else:
-                # If next character is '~', don't treat this as the end of a claim element.
-                claim_text = claim_text[0:loc+1]+claim_text[loc+2:]
-        
-        if char == '|': # This will exclude the pipe symbol from the output.
-            if curly_bracket:
-                claim_text = claim_text[0:loc]+"}"+claim_text[loc+1:]
-                curly_bracket = False
-        
-        if char == '!': # This will exclude the exclamation point and the character before it from the output. Then it'll got back one to capture the end of the element properly
-            claim_text = claim_text[0:loc-1]+claim_text[loc+1:]
-            loc -= 2 # Go back two now, will change to just one later when loc += 1 is encountered.
-        elif char == "{":
-            assert not(curly_bracket), bracket_error_str(claim_number, "Curly bracket started inside of curly bracket. Nested claim elements not supported at the moment", loc, claim_text)
-            curly_bracket = True
-        elif char == "}":
-            assert curly_bracket, bracket_error_str(claim_number, "Curly bracket ended without corresponding starting curly bracket", loc, claim_text)
-            curly_bracket = False
-        
-        loc += 1
-    
-    if curly_bracket:
-        claim_text = claim_text[0:loc-1]+"}"+claim_text[loc-1:]
-        curly_bracket = False
-    
-    if args.debug:
-        print("New element punctuation marking completed:", claim_text)
-    
-    return claim_text
-
-def mark_old_element_punctuation(claim_text, claim_number):
-    loc = 0
-    square_bracket = False
-    while loc < len(claim_text):
-        char = claim_text[loc]
-        
-        if (char == ',') or (char == ';') or (char == ':'):
-            if claim_text[loc+1] != '~':
-                if square_bracket:
-                    claim_text = claim_text[0:loc]+"]"+claim_text[loc:]
-                    square_bracket = False
-                    
-                    loc += 1
+                # If next character is '~', don't treat this as the end of a claim element. The '~' is removed.
+                marked_text.append(char)
+                loc += 1
+        elif char == '|': # This will exclude the pipe symbol from the output.
+            if in_bracket:
+                marked_text.append(end_bracket)
+                in_bracket = False
             else:
-                # If next character is '~', don't treat this as the end of a claim element.
-                claim_text = claim_text[0:loc+1]+claim_text[loc+2:]
-        
-        if char == '|': # This will exclude the pipe symbol from the output.
-            if square_bracket:
-                claim_text = claim_text[0:loc]+"]"+claim_text[loc+1:]
-                square_bracket = False
-        
-        if char == '!': # This will exclude the exclamation point and the character before it from the output. Then it'll got back one to capture the end of the element properly
-            claim_text = claim_text[0:loc-1]+claim_text[loc+1:]
-            loc -= 2 # Go back two now, will change to just one later when loc += 1 is encountered.
-        elif char == "[":
-            assert not(square_bracket), bracket_error_str(claim_number, "Square bracket started inside of square bracket. Nested claim elements not supported at the moment", loc, claim_text)
-            square_bracket = True
-        elif char == "]":
-            assert square_bracket, bracket_error_str(claim_number, "Square bracket ended without corresponding starting square bracket", loc, claim_text)
-            square_bracket = False
+                marked_text.append(char)
+        elif char == '!': # This will exclude the exclamation point and the character before it from the output.
+            if len(marked_text) > 0:
+                marked_text.pop()
+        elif char == start_bracket:
+            assert not(in_bracket), bracket_error_str(claim_number, "{} started inside of {}. Nested claim elements not supported at the moment".format(bracket_name, bracket_name.lower()), len(marked_text), "".join(marked_text)+claim_text[loc:])
+            in_bracket = True
+            marked_text.append(char)
+        elif char == end_bracket:
+            assert in_bracket, bracket_error_str(claim_number, "{} ended without corresponding starting {}".format(bracket_name, bracket_name.lower()), len(marked_text), "".join(marked_text)+claim_text[loc:])
+            in_bracket = False
+            marked_text.append(char)
+        else:
+            marked_text.append(char)
         
         loc += 1
     
-    if square_bracket:
-        claim_text = claim_text[0:loc-1]+"]"+claim_text[loc-1:]
-        square_bracket = False
-    
-    if args.debug:
-        print("Old element punctuation marking completed:", claim_text)
+    # End an element still open at the end of the claim before the final character, which is the period.
+    if in_bracket and (len(marked_text) > 0):
+        marked_text.insert(len(marked_text)-1, end_bracket)
     
-    return claim_text
+    return "".join(marked_text)
 
 def check_marking(claim_text, claim_number):
     loc = 0
@@ -229,232 +712,558 @@ def check_marking(claim_text, claim_number):
     
     return claim_text
 
-def mark_claim_text(claim_text, claim_number, new_elements_set):
-    if args.debug:
-        print("Input claim text:", claim_text)
-        print("Marking plural claim element starting terms...")
-    
-    # Remove character that adds text to claims for the antecedent basis checker to make antecedent basis work.
-    claim_text = claim_text.replace("`", "")
-    
-    # Add a period at the end of the claim if a period is absent. Otherwise, the parsing won't work properly.
-    if not claim_text.endswith('.'):
-        claim_text = claim_text + '.'
-    
-    # Mark plural claim element starting terms. This is hacky, but should work.
-    # Note that plural claim element starting terms act differently than singular claim element starting terms like "a" or "an". For plurals, the claim element starting term itself becomes part of the claim element.
-    # Other plural terms already handled as they start with a or an: a plurality, a number of
-    
-    # Note: I recognize that (for example) 'two or more' would conflict with 'two'. I guess putting 'two or more' first will mark this properly, but I haven't verified this yet.
-    plural_starting_terms = {'at least one', 'one or more', 'more than one', 'two or more', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten'}
-    
-    for plural_starting_term in plural_starting_terms:
-        #print(plural_starting_term)
-        
-        plural_starting_term_not_marked = True
-        while plural_starting_term_not_marked:
-            # This is done iteratively because when the text is marked, some of the starting positions change. The first iteration changes the first one that needs to be changed, the second changes the second one, etc.
-            
-            # Identify all instances of a plural starting term using regex to properly get the word boundaries.
-            res_alls = re.finditer("\\b{}\\b".format(plural_starting_term), claim_text, flags=re.IGNORECASE)
-            
-            # Identify all instances of a plural starting term prefixed with the, said, [, {, #. (# will be ignored.)
-            res_dones = re.finditer("(\\bthe |\\bsaid |\[|\{|\#)"+plural_starting_term+"\\b", claim_text, flags=re.IGNORECASE)
-            done_starts = set()
-            if not(res_dones is None):
-                for res_done in res_dones:
-                    if res_done.group().startswith("the "):
-                        len_to_add = 4
-                    elif res_done.group().startswith("said "):
-                        len_to_add = 5
-                    elif res_done.group().startswith("[") or res_done.group().startswith("{") or res_done.group().startswith("#"):
-                        len_to_add = 1
-                    else:
-                        warn("Unexpected plural starting term article: {}".format(res_done.group()), dav_keyword=res_done.group())
-                        sys.exit(1)
-                    done_starts.add(res_done.start()+len_to_add)
-            
-            # If the or said is not before the plural starting term, mark the plural starting term.
-            broke = False
-            if not(res_alls is None):
-                for res_all in res_alls:
-                    # Ignore all the instances identified in done_starts.
-                    if not(res_all.start() in done_starts):
-                        #print(res_all.group())
-                        claim_text = claim_text[0:res_all.start()]+"{"+claim_text[res_all.start():]
-                        #print(claim_text)
-                        broke = True # That is, broke out of this stage of the loop. Then this needs to iterate as the locations changed?
-                        break
-                if broke:
-                    continue
-            
-            plural_starting_term_not_marked = False
+# Parent claims of a multiple dependent claim, for example "claims 1 or 2" or "claims 1-3".
+multiple_parent_regex = re.compile(r"(\d+)(?:\s*(?:-|to|through)\s*(\d+))?")
+
+class Claim:
+    # One claim, with the fields that the checks need worked out once.
+    # Slots keep the records small when there are many claims.
+    __slots__ = ('number', 'text', 'cleaned_text', 'words', 'dependent', 'multiple_dependent', 'parents', 'parent_text', 'offset', 'line_number')
+    
+    def __init__(self, claim_text_with_number, offset=0, line_number=1):
+        # offset is the index of the claim in the claims text and line_number the line of the claims text the claim starts on, starting from 1.
+        self.offset = offset
+        self.line_number = line_number
+        
+        number_str = claim_text_with_number.split('.', 1)[0]
+        
+        # The claim text without the claim number, with the marking for the antecedent basis checker.
+        self.text = claim_text_with_number.split('.', 1)[1].strip()
+        self.words = self.text.lower().split(' ')
+        self.cleaned_text = remove_ab_notation(self.text)
+        
+        assert number_str.isdigit(), 'Invalid claim number: {}'.format(number_str)
+        
+        self.number = int(number_str)
+        
+        # The same length as the cleaned text, so that an index in one is an index in the other.
+        cleaned_text_lower = lower_same_length(self.cleaned_text)
+        self.dependent = 'claim' in cleaned_text_lower
+        self.multiple_dependent = self.dependent and ('claims' in cleaned_text_lower)
+        
+        # The parent claims, in the order given. parent_text is the text that should be the number of the parent claim of a claim depending on one claim, or None if there is none.
+        self.parents = []
+        self.parent_text = None
+        if self.multiple_dependent:
+            parents_text = self.cleaned_text[cleaned_text_lower.index('claims')+len('claims'):].split(',')[0]
+            for match in multiple_parent_regex.finditer(parents_text):
+                if match.group(2) is None:
+                    self.parents.append(int(match.group(1)))
+                else:
+                    self.parents.extend(range(int(match.group(1)), int(match.group(2))+1))
+        elif self.dependent and ('claim' in self.words) and (self.words.index('claim')+1 < len(self.words)):
+            self.parent_text = remove_punctuation(self.words[self.words.index('claim')+1])
+            if self.parent_text.isdigit():
+                self.parents.append(int(self.parent_text))
+    
+    def __repr__(self):
+        return 'Claim({}. {})'.format(self.number, self.text)
+
+class ClaimGraph:
+    # Which claims depend on which, built up as the claims are read.
     
-    if args.debug:
-        print("Marking singular claim element starting terms...")
-    
-    # Mark "a"
-    claim_text = re.sub("\\bA \\b", "A {", claim_text)
-    claim_text = re.sub("\\ba \\b", "a {", claim_text)
-    
-    # Mark "an"
-    claim_text = re.sub("\\bAn \\b", "An {", claim_text)
-    claim_text = re.sub("\\ban \\b", "an {", claim_text)
-    
-    # Mark "the"
-    claim_text = re.sub("\\bThe \\b", "The [", claim_text)
-    claim_text = re.sub("\\bthe \\b", "the [", claim_text)
-    
-    # Mark "said"
-    claim_text = re.sub("\\bSaid \\b", "Said [", claim_text)
-    claim_text = re.sub("\\bsaid \\b", "said [", claim_text)
-    
-    # Remove markings for commented out terms.
-    claim_text = re.sub("\#A \{", "A ", claim_text)
-    claim_text = re.sub("\#a \{", "a ", claim_text)
-    claim_text = re.sub("\#An \{", "An ", claim_text)
-    claim_text = re.sub("\#an \{", "an ", claim_text)
-    claim_text = re.sub("\#The \[", "The ", claim_text)
-    claim_text = re.sub("\#the \[", "the ", claim_text)
-    claim_text = re.sub("\#Said \[", "Said ", claim_text)
-    claim_text = re.sub("\#said \[", "said ", claim_text)
+    def __init__(self):
+        self.parents = {}
+        self.children = {}
+        
+        # The independent claim that each claim depends on directly or indirectly, or None if it is not known, for example if the parent claim does not exist.
+        self.independent_claims = {}
     
-    if args.debug:
-        print("Claim text after automatically marking starting terms:", claim_text)
-        print("Turning punctuation marks and vertical pipes into claim element endings...")
+    def add(self, claim):
+        self.parents[claim.number] = claim.parents
+        self.children.setdefault(claim.number, [])
+        
+        for parent_claim in claim.parents:
+            if parent_claim in self.children:
+                self.children[parent_claim].append(claim.number)
+        
+        if not(claim.dependent):
+            self.independent_claims[claim.number] = claim.number
+        elif len(claim.parents) > 0:
+            self.independent_claims[claim.number] = self.independent_claims.get(claim.parents[0])
+        else:
+            self.independent_claims[claim.number] = None
+    
+    def descendants(self, claim_number):
+        # The claims depending on the claim directly or indirectly.
+        descendants = []
+        claims_to_visit = list(self.children.get(claim_number, []))
+        while len(claims_to_visit) > 0:
+            child_claim = claims_to_visit.pop()
+            if not(child_claim in descendants):
+                descendants.append(child_claim)
+                claims_to_visit.extend(self.children.get(child_claim, []))
+        
+        return sorted(descendants)
+
+def parse_claims(lines, claim_graph=None):
+    # Reads the claims from lines (a file or any other iterable of lines), yielding a Claim for each claim as soon as it has been read, so that only one claim is held at a time.
+    # A claim starts at a line starting with a number and a period. If claim_graph is given, each claim is added to it.
+    claim_lines = None
+    claim_offset = 0
+    claim_line_number = 1
+    loc = 0
+    for line_number, line in enumerate(lines, 1):
+        line_start = loc
+        loc += len(line)
+        line = line.replace('\n', '')
+        
+        if line == '':
+            continue
+        
+        if line[0].isdigit() and ('.' in line[0:4]):
+            # New claim starting
+            if not(claim_lines is None):
+                claim = Claim(' '.join(claim_lines).strip(), claim_offset, claim_line_number)
+                if not(claim_graph is None):
+                    claim_graph.add(claim)
+                yield claim
+            
+            claim_lines = []
+            claim_offset = line_start
+            claim_line_number = line_number
+        
+        assert not(claim_lines is None), "Text before the first claim: {}".format(line)
+        
+        claim_lines.append(line.strip())
     
-    # Mark new claim elements based on punctuation and the marking notation.
-    claim_text = mark_new_element_punctuation(claim_text, claim_number)
+    assert not(claim_lines is None), "No claims found."
     
-    # By this point all the new elements should be marked.
-    assert claim_text.count("{") == claim_text.count("}"), "Error in marking of new claim elements. Number of left curly brackets does not match number of right curly brackets."
+    # The last claim.
+    claim = Claim(' '.join(claim_lines).strip(), claim_offset, claim_line_number)
+    if not(claim_graph is None):
+        claim_graph.add(claim)
+    yield claim
+
+class ElementTrie:
+    # A trie of the claim elements that old claim elements are automatically marked with.
+    # Each node is a dictionary from characters to child nodes. The key None of a node is the claim element ending at that node.
+    # extended() returns a new trie and only copies the nodes along the paths of the added elements, so a dependent claim can extend the trie of its parent claim without changing the trie of the parent claim or of other claims depending on it.
+    
+    def __init__(self, root=None):
+        if root is None:
+            root = {}
+        
+        self.root = root
     
-    # Automatically mark old elements with corresponding new elements.
-    if not args.manual_marking:
-        new_elements = re.finditer(r"\{.*?\}", claim_text, flags=re.IGNORECASE)
+    def extended(self, elements):
+        root = dict(self.root)
+        copied_nodes = {id(root)}
         
-        for new_element_iter in new_elements:
-            new_element = new_element_iter.group()[1:-1]
+        for element in elements:
+            node = root
+            for char in element:
+                child = node.get(char)
+                if child is None:
+                    child = {}
+                elif not(id(child) in copied_nodes):
+                    child = dict(child)
+                
+                copied_nodes.add(id(child))
+                node[char] = child
+                node = child
             
-            if not(new_element in new_elements_set): # and not(new_element in args.no_auto_mark):
-                new_elements_set.add(new_element)
+            node[None] = element
         
-        # Doing this in decreasing order of length and modifying the claims to not match in the interim should prevent conflicts. Consider the elements "coolant" and "coolant flow path". If "coolant" was marked before "coolant flow path", that would lead to "[coolant] flow path" for "coolant flow path". Marking "coolant flow path" before "coolant" doesn't help by itself as that just leads to "[[coolant] flow path]. The marking needs to be done such that subsequent markings won't match. So "coolant flow path" becomes "[~coolant flow path]". The replace operation looks for "[coolant", which is not present, so "coolant" is not matched here. Then when the marking is complete, replacing "[~" with "[" fixes the claims.
-        new_elements_list = sorted(list(new_elements_set), key=len, reverse=True)
-        for new_element in new_elements_list:
-            if args.debug:
-                print("Automatically marking old elements for: {}".format(new_element))
+        return ElementTrie(root)
+    
+    def matches(self, text, start):
+        # Returns the claim elements that text starts with at index start, shortest first.
+        elements = []
+        node = self.root
+        for i in range(start, len(text)):
+            node = node.get(text[i])
+            if node is None:
+                break
             
-            # Check that no elements are truncated versions of other elements.
-            if '['+new_element in claim_text:
-                for new_element_2 in new_elements_set:
-                    # The (not new_element == new_element_2) condition prevent matching when the elements are same as that is not a problem.
-                    # The ('['+new_element_2 in claim_text) condition should prevent the warning from appearing when there is no conflict.
-                    if (not new_element == new_element_2) and ('['+new_element_2 in claim_text):
-                        assert_warn(not new_element_2.startswith(new_element), "Claim {}: Possibly conflicting claim elements detected: \"{}\" and \"{}\". This can cause problems with the automatic marking of claim elements because the text of claim element \"{}\" starts with the same text as claim element \"{}\". Check the marked claim output.".format(claim_number, new_element_2, new_element, new_element_2, new_element))
+            if None in node:
+                elements.append(node[None])
+        
+        return elements
+
+class ElementScope:
+    # The claim elements introduced in a claim and in its parent claims.
+    # Each scope links to the scope of its parent claim instead of copying the elements of the parent claim, so a dependent claim inherits the elements of its parent claim in constant time.
+    
+    def __init__(self, claim_number, parent=None):
+        self.claim_number = claim_number
+        self.parent = parent
+        
+        # Index in the marked claim text of each element introduced in this claim.
+        self.positions = {}
+    
+    def add(self, element, position):
+        self.positions[element] = position
+    
+    def scopes(self):
+        # This scope and the scopes of the parent claims, starting with the independent claim.
+        scopes = []
+        scope = self
+        while not(scope is None):
+            scopes.append(scope)
+            scope = scope.parent
+        
+        scopes.reverse()
+        return scopes
+    
+    def __contains__(self, element):
+        scope = self
+        while not(scope is None):
+            if element in scope.positions:
+                return True
             
-            # Mark old claim elements corresponding to new claim elements.
-            claim_text = claim_text.replace('['+new_element, '[~'+new_element+']')
+            scope = scope.parent
+        
+        return False
+    
+    def __iter__(self):
+        for scope in self.scopes():
+            for element in scope.positions:
+                yield element
+    
+    def __len__(self):
+        return sum(len(scope.positions) for scope in self.scopes())
+    
+    def position(self, element):
+        # Elements inherited from the parent claims are at index -1, before everything in this claim. Returns None if the element was not introduced.
+        if element in self.positions:
+            return self.positions[element]
+        elif element in self:
+            return -1
+        else:
+            return None
+    
+    def introduction(self, element):
+        # The claim number and index in the marked claim text where the element was introduced, or None if the element was not introduced.
+        scope = self
+        while not(scope is None):
+            if element in scope.positions:
+                return scope.claim_number, scope.positions[element]
             
-            # Remove extra ']' for old claim elements already marked.
-            claim_text = claim_text.replace(']]', ']')
-            claim_text = claim_text.replace(']|', ']')
+            scope = scope.parent
         
-        # Remove temporary text added to make possibly conflicting claim elements not match.
-        claim_text = claim_text.replace('[~', '[')
-    
-    # Remove the character used to not mark words as this isn't helpful in the .marked file.
-    claim_text = claim_text.replace('#', '')
+        return None
     
-    if args.verbose:
-        print("Claim {} marked: {}".format(claim_number, claim_text))
-    
-    claim_text = mark_old_element_punctuation(claim_text, claim_number)
-    claim_text = check_marking(claim_text, claim_number)
+    def __repr__(self):
+        return repr(dict((element, self.position(element)) for element in self))
+
+class ElementIndex:
+    # Gives each claim element a bit so that sets of claim elements can be compared as integers. For example, the elements common to two claims are the bitwise and of the bits of the claims.
+    
+    def __init__(self):
+        self.element_bits = {}
+        self.elements = []
+    
+    def bits(self, elements):
+        bits = 0
+        for element in elements:
+            if not element in self.element_bits:
+                self.element_bits[element] = 1 << len(self.elements)
+                self.elements.append(element)
+            
+            bits |= self.element_bits[element]
+        
+        return bits
+    
+    def element_set(self, bits):
+        elements = set()
+        element_id = 0
+        while bits:
+            if bits & 1:
+                elements.add(self.elements[element_id])
+            
+            bits >>= 1
+            element_id += 1
+        
+        return elements
+
+def count_elements(bits):
+    return bin(bits).count('1')
+
+def read_warnings_file(warnings_text, force=False, debug=False):
+    # Returns the warnings in the text of a warnings file and the number of commented out warnings.
+    # The file is read in one pass, checking that every line has two columns.
+    csv_reader = csv.reader(io.StringIO(warnings_text), delimiter=",")
+    
+    warnings = []
+    prev_regex = ''
+    line_num = 1
+    warnings_commented_out = 0
+    header = None
+    for row in csv_reader:
+        assert len(row) == 2, "The warnings file should have two columns. This line does not: "+row[0]
+        
+        if header is None:
+            header = row
+            continue
+        
+        warning = dict(zip(header, row))
+        warning['line'] = csv_reader.line_num
+        
+        if force:
+            if warning['regex'].startswith('#'):
+                warning['regex'] = warning['regex'][1:]
+        
+        if not warning['regex'].startswith('#'):
+            assert warning['regex'] != prev_regex, "Duplicate regex in warnings file: {}".format(warning['regex'])
+            prev_regex = warning['regex']
+            
+            # The required words of the rule and whether the rule could take exponential time to check are found here so that they are cached with the warnings.
+            words = rule_words(warning['regex'])
+            if words is None:
+                warning['words'] = None
+            else:
+                warning['words'] = sorted(words)
+            
+            warning['backtracking'] = rule_backtracking(warning['regex'])
+            
+            warnings.append(warning)
+            line_num += 1
+            if debug:
+                print("Reading from warnings file:", line_num, warning['regex'])
+        else:
+            warnings_commented_out += 1
     
-    assert claim_text.count("[") == claim_text.count("]"), "Error in marking of old claim elements. Number of left square brackets does not match number of right square brackets."
-    assert not("|" in claim_text), "Error in marking of end of a claim element. Look for '|' by itself in the marked claim."
+    return warnings, warnings_commented_out
+
+def default_cache_dir():
+    # The cache is stored in $XDG_CACHE_HOME/plint, or ~/.cache/plint if XDG_CACHE_HOME is not set.
+    cache_home = os.environ.get('XDG_CACHE_HOME', '')
+    if cache_home == '':
+        cache_home = os.path.join(os.path.expanduser('~'), '.cache')
     
-    return claim_text
+    return os.path.join(cache_home, 'plint')
 
-# <https://stackoverflow.com/a/40986475>
-def powerset(iterable):
-    "powerset([1,2,3]) --> () (1,) (2,) (3,) (1,2) (1,3) (2,3) (1,2,3)"
-    s = list(iterable)  # allows duplicate elements
-    return chain.from_iterable(combinations(s, r) for r in range(len(s)+1))
+def warnings_cache_file(file_to_load, force, cache_dir):
+    # Each warnings file has its own cache file, separately for whether commented out warnings are enabled.
+    name = hashlib.sha256(os.path.realpath(file_to_load).encode('utf-8')).hexdigest()[0:16]
+    if force:
+        name += '-force'
+    
+    return os.path.join(cache_dir, name+'.json')
 
-def load_warnings_file(file_to_load):
+def load_warnings_file(file_to_load, force=False, debug=False, cache_dir=None):
     # Opening CSV file.
     # Needs to be "MS-DOS" format, not UTF-8. For some reason the really old version of Python the USPTO has doesn't like Unicode CSV files.
-
-    # Check that it only has two columns first.
-    with open(file_to_load, 'r', encoding="ascii") as warnings_csv_file:
-        csv_reader = csv.reader(warnings_csv_file, delimiter=",")
-        
-        for row in csv_reader:
-            assert len(row) == 2, "The warnings file should have two columns. This line does not: "+row[0]
-
-    with open(file_to_load, 'r', encoding="ascii") as warnings_csv_file:
-        warnings_csv = csv.DictReader(warnings_csv_file, delimiter=",")
-        warnings = []
-        prev_regex = ''
-        line_num = 1
-        warnings_commented_out = 0
-        for warning in warnings_csv:
-            if args.force:
-                if warning['regex'].startswith('#'):
-                    warning['regex'] = warning['regex'][1:]
-            
-            if not warning['regex'].startswith('#'):
-                assert warning['regex'] != prev_regex, "Duplicate regex in warnings file: {}".format(warning['regex'])
-                prev_regex = warning['regex']
-                warnings.append(warning)
-                line_num += 1
-                if args.debug:
-                    print("Reading from warnings file:", line_num, warning['regex'])
-            else:
-                warnings_commented_out += 1
+    # If cache_dir is given, the checked warnings are cached there. A cached copy is only used if the hash and modification time of the warnings file and the version of plint are the same as when the cached copy was written.
+    with open(file_to_load, 'rb') as warnings_csv_file:
+        warnings_bytes = warnings_csv_file.read()
+    
+    cache_key = {'version': plint_version, 'mtime': os.stat(file_to_load).st_mtime_ns, 'sha256': hashlib.sha256(warnings_bytes).hexdigest()}
+    
+    cached = None
+    if not(cache_dir is None):
+        cache_file = warnings_cache_file(file_to_load, force, cache_dir)
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = None
         
-        print("{} warnings loaded from {}, {} suppressed.\n".format(len(warnings), file_to_load, warnings_commented_out))
+        if not(cached is None) and (cached.get('key') != cache_key):
+            cached = None
     
-    return warnings
-
-if args.legal:
-    print("Copyright 2022 Ben Trettel. plint is licensed under the GNU Affero General Public License v3.0, a copy of which has been provided with the software. The license is also available online: https://www.gnu.org/licenses/agpl-3.0.en.html\n")
-    print("This work was developed by Ben Trettel in his personal capacity. The views expressed are his own and do not necessarily reflect the views or policies of the United States Patent and Trademark Office, the Department of Commerce, or the United States government.\n")
-    print("This work comes with absolutely no warranty.")
-    exit()
-
-if args.test:
-    match_bool, match_str = re_matches('\\btest\\b', 'This is a test.')
-    assert match_bool
-    match_bool, match_str = re_matches('\\btest\\b', 'A different sentence.')
-    assert not(match_bool)
+    if cached is None:
+        warnings, warnings_commented_out = read_warnings_file(warnings_bytes.decode('ascii'), force=force, debug=debug)
+        
+        if not(cache_dir is None):
+            # Write to a temporary file first so that another process never reads a partly written cache file. A cache that can't be written is not an error.
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                temp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump({'key': cache_key, 'warnings': warnings, 'warnings_commented_out': warnings_commented_out}, f)
+                os.replace(temp_file, cache_file)
+            except OSError:
+                pass
+    else:
+        if debug:
+            print("Reading warnings from cache file:", cache_file)
+        
+        warnings = cached['warnings']
+        warnings_commented_out = cached['warnings_commented_out']
     
-    assert remove_punctuation('an element; another element') == 'an element another element'
+    print("{} warnings loaded from {}, {} suppressed.\n".format(len(warnings), file_to_load, warnings_commented_out))
     
-    claim_text = "A contraption} comprising: an enclosure, a display, at least one button, and at least one widget} mounted on the enclosure, wherein the enclosure] is green, the at least one button] is yellow, and the at least one widget] is blue."
+    return RuleEngine(warnings, os.path.basename(file_to_load))
+
+# Warnings files already loaded in this process, by file name and whether commented out warnings are enabled.
+loaded_warnings_files = {}
+
+def get_warnings_file(file_to_load, force=False, debug=False, cache=True):
+    key = (os.path.realpath(file_to_load), force)
     
-    # Test marked claim.
-    marked_claim_text = mark_claim_text(claim_text, 1, set())
+    if not key in loaded_warnings_files:
+        if cache:
+            cache_dir = default_cache_dir()
+        else:
+            cache_dir = None
+        
+        loaded_warnings_files[key] = load_warnings_file(file_to_load, force=force, debug=debug, cache_dir=cache_dir)
     
-    assert marked_claim_text == "A {contraption} comprising: an {enclosure}, a {display}, {at least one button}, and {at least one widget} mounted on the [enclosure], wherein the [enclosure] is green, the [at least one button] is yellow, and the [at least one widget] is blue."
+    return loaded_warnings_files[key]
+
+class ClaimCache:
+    # Results of the slow per-claim steps, the warnings file search and the marking of the claim elements, so that linting the claims again only redoes these steps for claims that changed.
+    # Each result is stored under a hash of everything it depends on. For the marking, that includes the claim elements of the parent claims, so a change to a claim that changes its elements also redoes the marking of the claims depending on it.
+    # If a file name is given, the cache is read from and written to that file.
+    
+    def __init__(self, file_name=None):
+        self.file_name = file_name
+        self.entries = {}
+        
+        # The entries used in the current lint. Only these are kept afterwards, so the cache does not grow as the claims are edited.
+        self.used_entries = {}
+        self.hits = 0
+        self.misses = 0
+        
+        if not(file_name is None):
+            try:
+                with open(file_name, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                
+                if data.get('version') == plint_version:
+                    self.entries = data['entries']
+            except (OSError, ValueError):
+                pass
+    
+    def key(self, *parts):
+        return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        # Returns None if there is no cached result.
+        if key in self.entries:
+            self.hits += 1
+            self.used_entries[key] = self.entries[key]
+            return self.entries[key]
+        else:
+            self.misses += 1
+            return None
     
-    claim_text = "This is a test. `Commented out`"
+    def put(self, key, value):
+        self.entries[key] = value
+        self.used_entries[key] = value
     
-    cleaned_claim_text = remove_ab_notation(claim_text)
+    def finish(self):
+        # Drop the entries not used in the lint that just finished and write the cache file, if any. A cache file that can't be written is not an error.
+        self.entries = self.used_entries
+        self.used_entries = {}
+        
+        if not(self.file_name is None):
+            try:
+                os.makedirs(os.path.dirname(self.file_name), exist_ok=True)
+                temp_file = '{}.{}.tmp'.format(self.file_name, os.getpid())
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump({'version': plint_version, 'entries': self.entries}, f)
+                os.replace(temp_file, self.file_name)
+                
+                prune_claim_cache_files(os.path.dirname(self.file_name))
+            except OSError:
+                pass
+
+# The most claim cache files kept on disk. The least recently written files beyond this are deleted.
+max_claim_cache_files = 50
+
+def claim_cache_file(claims_file):
+    # The claim cache of each claims file is stored with the warnings file cache.
+    return os.path.join(default_cache_dir(), 'claims-'+hashlib.sha256(os.path.realpath(claims_file).encode('utf-8')).hexdigest()[0:16]+'.json')
+
+def prune_claim_cache_files(cache_dir):
+    # Deletes the least recently written claim cache files in cache_dir beyond max_claim_cache_files. Files that can't be deleted, for example because another process just deleted them, are skipped.
+    cache_files = []
+    for cache_file in glob.glob(os.path.join(cache_dir, 'claims-*.json')):
+        try:
+            cache_files.append((os.stat(cache_file).st_mtime_ns, cache_file))
+        except OSError:
+            pass
+    
+    cache_files.sort(reverse=True)
+    for mtime, cache_file in cache_files[max_claim_cache_files:]:
+        try:
+            os.remove(cache_file)
+        except OSError:
+            pass
+
+def claim_location(claim_number, start=None, end=None):
+    # Location of a warning about a claim. start and end are the indices of the matched text in the claim text without the claim number and the marking for the antecedent basis checker, if the warning is about specific text.
+    return {'file': 'claims', 'claim': claim_number, 'start': start, 'end': end}
+
+def spec_location(spec, offset):
+    # Location of a warning about the text at the index offset in the text of a SpecDocument.
+    line, column = spec.location(offset)
+    return {'file': 'spec', 'offset': offset, 'line': line, 'column': column}
+
+def claim_offsets(claims_text):
+    # For each claim number, the claim text checked against the warnings file (Claim.cleaned_text) and the index in claims_text of each character of it.
+    # This maps the locations of warnings about claims back to the claims text including the claim numbers, line breaks, and marking.
+    claims = []
+    loc = 0
+    for line in io.StringIO(claims_text):
+        line_start = loc
+        loc += len(line)
+        line = line.replace('\n', '')
+        
+        if line == '':
+            continue
+        
+        stripped_line = line.strip()
+        stripped_start = line_start + len(line) - len(line.lstrip())
+        stripped_offsets = list(range(stripped_start, stripped_start+len(stripped_line)))
+        
+        if line[0].isdigit() and ('.' in line[0:4]):
+            claims.append((list(stripped_line), stripped_offsets))
+        elif len(claims) > 0:
+            # The space joining the lines is at the line break.
+            claims[-1][0].extend([' ']+list(stripped_line))
+            claims[-1][1].extend([line_start-1]+stripped_offsets)
+    
+    offsets_by_claim = {}
+    for chars, offsets in claims:
+        claim_number_str = ''.join(chars).split('.', 1)[0]
+        if not claim_number_str.isdigit():
+            continue
+        
+        # Same steps as remove_ab_notation(), keeping the index of each character.
+        pairs = list(zip(chars, offsets))[len(claim_number_str)+1:]
+        pairs = [pair for pair in pairs if not(pair[0] in '{}[]#|!')]
+        
+        cleaned_pairs = []
+        in_backticks = False
+        for char, offset in pairs:
+            if char == '`':
+                in_backticks = not(in_backticks)
+            elif not(in_backticks):
+                cleaned_pairs.append((char, offset))
+        
+        while (len(cleaned_pairs) > 0) and cleaned_pairs[0][0].isspace():
+            cleaned_pairs.pop(0)
+        
+        while (len(cleaned_pairs) > 0) and cleaned_pairs[-1][0].isspace():
+            cleaned_pairs.pop()
+        
+        offsets_by_claim[int(claim_number_str)] = (''.join(char for char, offset in cleaned_pairs), [offset for char, offset in cleaned_pairs])
     
-    assert cleaned_claim_text == "This is a test."
+    return offsets_by_claim
+
+def claim_span(offsets_by_claim, location):
+    # The start and end indices in the claims text of a warning about a claim, using the offsets from claim_offsets(). Warnings about a whole claim cover the whole claim text. Returns None if the claim is not in the claims text.
+    if (location is None) or not(location['claim'] in offsets_by_claim):
+        return None
     
-    print('All tests passed.')
+    cleaned_claim_text, offsets = offsets_by_claim[location['claim']]
+    if len(offsets) == 0:
+        return None
     
-    exit()
+    if location['start'] is None:
+        return offsets[0], offsets[-1]+1
+    else:
+        return offsets[min(location['start'], len(offsets)-1)], offsets[min(max(location['end'], 1), len(offsets))-1]+1
 
-if args.claims is None:
-    eprint("Enter a claims file.")
-    exit(1)
+def default_warnings_file(name):
+    # The default warnings files are stored in the same directory as plint.
+    return os.path.join(os.path.dirname(os.path.realpath(__file__)), name+file_ext)
 
-if args.claims.endswith('.json'):
+def read_json_file(args):
     # Instead of using command line flags, get configuration from JSON file.
     
     json_file = copy.deepcopy(args.claims)
@@ -485,459 +1294,1218 @@ if args.claims.endswith('.json'):
     
     assert not(args.claims is None), "Claims file not set in JSON file."
     assert isinstance(args.filter, list), "In the JSON file, the name 'filter' must be an array."
+    
+    return data
 
-if args.debug:
-    print(args)
-    print("Reading {}...".format(args.claims))
-
-rule_filters = args.filter
+def check_input_files(args):
+    # Returns an error message if the input files can not be used, otherwise None.
+    if not args.claims_warnings.endswith(file_ext):
+        return 'Warnings file must be a {} file: {}'.format(file_ext, args.claims_warnings)
+    
+    if not os.path.isfile(args.claims):
+        return 'Claims file does not exist: {}'.format(args.claims)
+    
+    if not os.path.isfile(args.claims_warnings):
+        return 'Warnings file does not exist: {}'.format(args.claims_warnings)
+    
+    return None
 
-use_outfile = False
-
-file_ext = '.csv'
-
-if args.nitpick:
-    args.ant_basis   = True
-    args.endings     = True
-    args.uspto       = True
-    args.restriction = True
-
-if args.debug:
-    args.verbose = True
-
-if args.restriction:
-    args.ant_basis = True
-
-if args.claims_warnings is None:
-    args.claims_warnings = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'claims'+file_ext)
-
-if not args.claims_warnings.endswith(file_ext):
-    eprint('Warnings file must be a {} file:'.format(file_ext), args.claims_warnings)
-    sys.exit(1)
-
-if not os.path.isfile(args.claims):
-    eprint('Claims file does not exist:', args.claims)
-    sys.exit(1)
-
-if not os.path.isfile(args.claims_warnings):
-    eprint('Warnings file does not exist:', args.claims_warnings)
-    sys.exit(1)
-
-warnings = load_warnings_file(args.claims_warnings)
-
-# Set the use_outfile after checking that the file exists, otherwise, if the claims file doesn't exist, the error message will be printed to the output file.
-use_outfile = args.outfile
-if use_outfile:
-    outfile = args.claims+'.out'
-    open(outfile, 'w').close()
-
-prev_claim_number      = 0
-number_of_claims       = 0
-number_of_indep_claims = 0
-number_of_dep_claims   = 0
-claim_numbers = set()
-new_elements_in_claims = {}
-claims_text = []
-first_claim = True
-shortest_indep_claim_len = 1e6
-shortest_indep_claim_number_by_len = 0
-indep_claims = set()
-indep_claim_types = {}
-parent_claims = {}
-terms_that_should_not_be_in_claim_element = {r'\bclaim\b', r'\bcomprising\b', r'\bcomprises\b', r'\bconsisting of\b', r'\bconsisting essentially of\b', r'\bwherein\b', r'\bwhereby\b'}
-long_claim_element_limit = 100
-
-# global variables
-number_of_warnings = 0
-dav_keywords       = set()
-
-if not args.title is None:
-    args.title = args.title.strip()
-    
-    title_warnings_file = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'title'+file_ext)
+class SpecDocument:
+    # The specification, read once and shared by the checks of the specification.
     
-    title_warnings = load_warnings_file(title_warnings_file)
-    
-    assert_warn(len(args.title) <= 500, "The title is {} characters long. The maximum title length under 37 CFR 1.72 is 500 characters. See MPEP 606.".format(len(args.title)))
-    
-    for title_warning in title_warnings:
-        if args.debug:
-            print("Trying regex:", title_warning['regex'])
+    def __init__(self, spec):
+        # The lines of the specification without the line endings.
+        self.lines = []
         
-        match_bool, match_str = re_matches(title_warning['regex'], args.title)
-        message = 'Title recites "{}". {}'.format(match_str, title_warning['message'].split('#')[0].strip())
-        assert_warn(not(match_bool), message)
-
-if not args.spec is None:
-    # Check for lexicographic definitions.
-    with open(args.spec, "r", encoding="utf-8") as spec_file:
-        line = spec_file.readline()
-        spec_string = ''
+        # Sections of the specification as (heading, lines) tuples, starting a new section at each all uppercase line. The lines of each section are stripped and start with the heading. The lines before the first heading have the heading None.
+        self.sections = [(None, [])]
+        
+        stripped_lines = []
+        
+        # Index of the start of each line in self.text, and the number of spaces stripped from the start of each line.
+        self.line_starts = []
+        self.line_indents = []
+        
+        # Indices in self.text that always end a sentence: the starts and ends of blank lines and headings. This will make a heading not appear as parts of the sentences following the heading.
+        sentence_breaks = [0]
         
-        # Concatenate all lines with one space between them.
-        while line:
+        loc = 0
+        for line in io.StringIO(spec):
+            line = line.replace('\n', '')
+            self.lines.append(line)
+            
             # Strip spaces from beginnings and ends of lines.
-            line = line.replace('\n', '').strip().replace('       ', ' ')
+            stripped_line = line.strip()
+            stripped_lines.append(stripped_line)
+            self.line_starts.append(loc)
+            self.line_indents.append(len(line) - len(line.lstrip()))
             
-            # This if statement will make a heading not appear as parts of the sentences following the heading.
-            if line == line.upper():
-                line = line+'.'
+            if stripped_line.isupper():
+                self.sections.append((stripped_line, []))
             
-            # Add a single space after each line.
-            spec_string = spec_string+line+' '
+            self.sections[-1][1].append(stripped_line)
             
-            # Advance line
-            line = spec_file.readline()
+            if stripped_line == stripped_line.upper():
+                sentence_breaks.append(loc)
+                sentence_breaks.append(loc+len(stripped_line))
+            
+            loc += len(stripped_line) + 1
+        
+        # The stripped lines joined by single spaces, so that text split across lines can be found.
+        self.text = " ".join(stripped_lines)
         
-        # Split into sentences the dumb way: splitting at periods.
-        sentences = spec_string.split('. ')
+        # Sentences end at periods followed by spaces, except after abbreviations like "e.g." or "FIG.".
+        for sentence_end in sentence_end_regex.finditer(self.text):
+            if not(sentence_end.group(1).lstrip('(["“').lower() in abbreviations):
+                sentence_breaks.append(sentence_end.end())
         
-        # Run regex against each sentence. Highlight matching phrase in sentence.
-        for sentence in sentences:
-            result = re.search(r"(“|”|\bi\.e\.|\b,\sthat\sis\b|\bmeaning\b|\bmeans(?!\sfor|\sto)\b|\bdefinitions?\b|\bdefines?\b|\bdefined\b|\bdefining\b|\bterms?\b|\btermed\b|\bterminology\b|\bphrases?\b|\bin\sother\swords\b|\bknown\sas\b|\bcalled\b|\bnamed\b|\bso.called\b|\bsimply\sput\b|\bput\sdifferently\b|\bthat\sis\sto\ssay\b|\bnamely\b|\botherwise\sstated\b|\bin\sshort\b|\balternatively\sstated\b|\bput\sit\sdifferently\b|\bidentified\b|\breferred\sto\sas\b|\bdesignated\b|\bas\sused\sherein\b|\bas\sused\shere\b|\bas\sopposed\sto\b|\bis\sunderstood\sto\smean\b|\bis\sunderstood\sherein\b|\bconstrued\b|\bfor\sexample\b|\be\.g\.)", sentence, flags=re.IGNORECASE)
+        sentence_breaks.append(len(self.text))
+        sentence_breaks.sort()
+        
+        # (start, end) of each sentence in self.text, without the period and spaces at the end.
+        self.sentence_spans = []
+        for sentence_start, sentence_end in zip(sentence_breaks, sentence_breaks[1:]):
+            sentence = self.text[sentence_start:sentence_end]
+            sentence_start += len(sentence) - len(sentence.lstrip())
+            sentence = sentence.strip()
+            if sentence.endswith('.'):
+                sentence = sentence[:-1]
             
-            if not result is None:
-                warn("Spec. quote with possible lexicographic definition: {}.".format(sentence.replace(result.group(), '*****'+result.group()+'*****')))
+            if sentence != '':
+                self.sentence_spans.append((sentence_start, sentence_start+len(sentence)))
+        
+        self.sentence_starts = [sentence_span[0] for sentence_span in self.sentence_spans]
+    
+    def sentence_span(self, offset):
+        # The (start, end) of the sentence containing the index offset in self.text, or None if the offset is not in a sentence.
+        i = bisect.bisect_right(self.sentence_starts, offset) - 1
+        if (i >= 0) and (offset < self.sentence_spans[i][1]):
+            return self.sentence_spans[i]
+        else:
+            return None
+    
+    def location(self, offset):
+        # The line and column numbers in the specification file, starting from 1, of the index offset in self.text.
+        i = bisect.bisect_right(self.line_starts, offset) - 1
+        return i+1, offset-self.line_starts[i]+self.line_indents[i]+1
 
-if args.debug:
-    print("Constructing list with text of claims including number...")
+def lower_same_length(text):
+    # Lowercase text with the same length as the text, so that offsets in it are also offsets in the text. str.lower() makes some characters longer, for example "\u0130" becomes "i\u0307", and these characters are replaced with the first character of their lowercase instead.
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    
+    return "".join(char.lower()[0] for char in text)
 
-with open(args.claims) as claim_file:
-    line = claim_file.readline()
+class ElementCounter:
+    # Counts the appearances of many claim elements in a text in one pass with the Aho-Corasick algorithm. Like str.count, appearances of the same element don't overlap.
+    # With ignore_case, the text and the elements are compared in lowercase (see lower_same_length()). With whole_words, an appearance only counts if it is not part of a longer word.
+    
+    def __init__(self, elements, ignore_case=False, whole_words=False):
+        self.elements = list(elements)
+        self.ignore_case = ignore_case
+        self.whole_words = whole_words
+        
+        # For each state of the automaton: the next states by character, the state to fall back to when the next character doesn't match, and the elements (with their lengths) ending at the state.
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+        
+        for element in self.elements:
+            key = element
+            if ignore_case:
+                key = lower_same_length(key)
+            
+            if key == '':
+                continue
+            
+            state = 0
+            for char in key:
+                if not(char in self.goto[state]):
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                
+                state = self.goto[state][char]
+            
+            self.outputs[state].append((element, len(key)))
+        
+        # Add the fallback states breadth first, so the fallback states of shorter prefixes are known first.
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                
+                fail_state = self.fail[state]
+                while (fail_state != 0) and not(char in self.goto[fail_state]):
+                    fail_state = self.fail[fail_state]
+                
+                self.fail[next_state] = self.goto[fail_state].get(char, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
     
-    while line:
-        line = line.replace('\n', '')
+    def count(self, text, max_offsets=3):
+        # Returns a dictionary with the number of appearances of each element and a dictionary with the offsets in the text of the first max_offsets appearances of each element.
+        if self.ignore_case:
+            text = lower_same_length(text)
         
-        if line != '':
-            if line[0].isdigit():
-                if '.' in line[0:4]:
-                    # New claim starting
-                    if not(first_claim):
-                        claims_text.append(claim_text_with_number.strip())
-                    else:
-                        first_claim = False
-                    
-                    claim_text_with_number = line.strip()
-                    
-                    # Advance line
-                    line = claim_file.readline()
-                    continue
+        counts = {}
+        offsets = {}
+        for element in self.elements:
+            counts[element] = 0
+            offsets[element] = []
+        
+        ends = {}
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        state = 0
+        for i, char in enumerate(text):
+            while (state != 0) and not(char in goto[state]):
+                state = fail[state]
+            
+            state = goto[state].get(char, 0)
             
-            claim_text_with_number += ' '+line.strip()
+            for element, length in outputs[state]:
+                start = i + 1 - length
+                
+                # Skip appearances overlapping the previous appearance of the same element.
+                if start < ends.get(element, 0):
+                    continue
+                
+                if self.whole_words:
+                    if (start > 0) and is_word_char(text[start-1]):
+                        continue
+                    
+                    if (i + 1 < len(text)) and is_word_char(text[i+1]):
+                        continue
+                
+                ends[element] = i + 1
+                counts[element] += 1
+                if len(offsets[element]) < max_offsets:
+                    offsets[element].append(start)
         
-        # Advance line
-        line = claim_file.readline()
-
-# Add the last claim.
-claims_text.append(claim_text_with_number.strip())
-
-if args.debug:
-    print("Processing the claims list...")
+        return counts, offsets
 
-if args.ant_basis:
-    with open(args.claims+'.marked', 'w') as f:
-        print("Writing marked claims to {}...".format(args.claims+'.marked'))
-
-lowest_claim_number = 0
-
-for claim_text_with_number in claims_text:
-    claim_number_str = claim_text_with_number.split('.', 1)[0]
-    claim_text = claim_text_with_number.split('.', 1)[1].strip()
-    claim_words = claim_text.lower().split(' ')
-    cleaned_claim_text = remove_ab_notation(claim_text)
+class OutputSink:
+    # Where output goes: a stream like sys.stderr, a file opened once for writing, or memory if neither is given. The output in memory is returned by getvalue().
+    # A file is buffered until close() is called.
     
-    assert claim_number_str.isdigit(), 'Invalid claim number: {}'.format(claim_number_str)
+    def __init__(self, stream=None, file_name=None):
+        self.file_name = file_name
+        
+        if not(file_name is None):
+            self.stream = open(file_name, 'w')
+        elif stream is None:
+            self.stream = io.StringIO()
+        else:
+            self.stream = stream
     
-    claim_number = int(claim_number_str)
+    def print(self, *args, **kwargs):
+        print(*args, file=self.stream, **kwargs)
     
-    if not(args.to_claim is None):
-        if claim_number > args.to_claim:
-            eprint("Not all claims were analyzed. Stopping at claim {}.".format(args.to_claim))
-            if use_outfile:
-                print("Not all claims were analyzed. Stopping at claim {}.".format(args.to_claim))
-            break
+    def write(self, text):
+        self.stream.write(text)
     
-    number_of_claims += 1
-    claim_numbers.add(claim_number)
+    def getvalue(self):
+        return self.stream.getvalue()
     
-    if lowest_claim_number == 0:
-        lowest_claim_number = claim_number
+    def close(self):
+        if not(self.file_name is None):
+            self.stream.close()
+
+class LintResult:
+    # Everything found when linting one set of claims.
     
-    assert not(claim_number == prev_claim_number), 'There are multiple of claim {}.'.format(claim_number)
+    def __init__(self):
+        # Each warning is a dictionary with the message, the keyword for the DAV claims viewer search string, if any, and the location, if any.
+        self.warnings = []
+        self.dav_keywords = set()
+        
+        # Marked claims for the antecedent basis analysis, by claim number.
+        self.marked_claims = {}
+        
+        self.number_of_claims       = 0
+        self.number_of_indep_claims = 0
+        self.number_of_dep_claims   = 0
+        self.lowest_claim_number    = 0
+        self.claim_numbers = set()
+        self.indep_claims = set()
+        self.indep_claim_types = {}
+        self.parent_claims = {}
+        self.claim_graph = ClaimGraph()
+        self.new_elements_in_claims = {}
+        
+        # Claim number and index in the marked claim text where each claim element was first introduced.
+        self.element_introductions = {}
+        self.shortest_indep_claim_len = 1e6
+        self.shortest_indep_claim_number_by_len = 0
+        
+        # With --profile, the Profiler of the lint.
+        self.profile = None
     
-    assert claim_number > prev_claim_number, 'Claim {} is out of order'.format(claim_number)
+    def number_of_warnings(self):
+        return len(self.warnings)
     
-    assert_warn(cleaned_claim_text.endswith('.'), 'Claim {} does not end with a period. See MPEP 608.01(m).'.format(claim_number))
+    def dav_search_string(self):
+        dav_search_string = ''
+        for dav_keyword in self.dav_keywords:
+            if ' ' in dav_keyword:
+                dav_search_string += '"'+dav_keyword+'" '
+            else:
+                dav_search_string += dav_keyword+' '
+        return dav_search_string.strip()
     
-    claim_len = len(cleaned_claim_text)
-    if args.debug:
-        print("Length of claim {}: {} characters.".format(claim_number, claim_len))
+    def exit_status(self):
+        if self.number_of_warnings() > 0:
+            return 2
+        else:
+            return 0
+
+class Profiler:
+    # Records the time spent in each stage of linting with --profile, and for each warnings file rule, the time spent checking the rule, the number of times it was checked, and the number of times it matched.
+    # The time in a stage started inside another stage only counts for the inner stage, so the times of the stages add up to the total time.
+    
+    def __init__(self):
+        self.stage_seconds = {}
+        self.rules = {}
+        self.stages = []
+        self.stage_start = None
+    
+    def add_rules(self, rule_engine, stage):
+        # Adds the rules of a warnings file, so that rules that are never checked are in the report too.
+        for rule_index, (compiled_regex, message, dependent_only) in enumerate(rule_engine.rules):
+            self.rules.setdefault(rule_engine.rule_ids[rule_index], {'regex': compiled_regex.pattern, 'stage': stage, 'seconds': 0.0, 'evaluations': 0, 'hits': 0})
+    
+    def charge(self):
+        # Adds the time since the last stage started or stopped to the current stage.
+        now = time.perf_counter()
+        if len(self.stages) > 0:
+            self.stage_seconds[self.stages[-1]] = self.stage_seconds.get(self.stages[-1], 0.0) + now - self.stage_start
+        
+        self.stage_start = now
+    
+    def start(self, stage):
+        self.charge()
+        self.stages.append(stage)
+    
+    def stop(self):
+        self.charge()
+        self.stages.pop()
+    
+    @contextlib.contextmanager
+    def stage(self, stage):
+        self.start(stage)
+        try:
+            yield
+        finally:
+            self.stop()
+    
+    def record_rule(self, rule_id, seconds, hit):
+        rule = self.rules[rule_id]
+        rule['seconds'] += seconds
+        rule['evaluations'] += 1
+        if hit:
+            rule['hits'] += 1
+    
+    def merge(self, other):
+        # Adds the times and counts of another Profiler, for example of another file in batch mode.
+        for stage in other.stage_seconds:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + other.stage_seconds[stage]
+        
+        for rule_id in other.rules:
+            if rule_id in self.rules:
+                for key in ['seconds', 'evaluations', 'hits']:
+                    self.rules[rule_id][key] += other.rules[rule_id][key]
+            else:
+                self.rules[rule_id] = dict(other.rules[rule_id])
     
-    parent_claim = None
+    def report(self):
+        # The stages and the rules, each slowest first.
+        stages = [{'stage': stage, 'seconds': seconds} for stage, seconds in sorted(self.stage_seconds.items(), key=lambda item: -item[1])]
+        
+        rules = []
+        for rule_id in sorted(self.rules, key=lambda rule_id: -self.rules[rule_id]['seconds']):
+            rule = {'rule_id': rule_id}
+            rule.update(self.rules[rule_id])
+            rules.append(rule)
+        
+        return {'plint_version': plint_version, 'total_seconds': sum(self.stage_seconds.values()), 'stages': stages, 'rules': rules}
     
-    if not 'claim' in cleaned_claim_text.lower():
-        # independent claim
-        dependent = False
-        number_of_indep_claims += 1
+    def print_report(self, report_file, number_of_rules=10):
+        report = self.report()
         
-        indep_claims.add(claim_number)
+        print()
+        print("Profile:")
+        for stage in report['stages']:
+            print("{:<20} {:9.4f} s".format(stage['stage']+':', stage['seconds']))
+        print("{:<20} {:9.4f} s".format('total:', report['total_seconds']))
         
-        assert_warn(cleaned_claim_text.startswith('A ') or cleaned_claim_text.startswith('An '), "Independent claim {} does not start with 'A' or 'An'. This is not required but is typical. See MPEP 608.01(m) for the requirements.".format(claim_number))
+        print()
+        print("Slowest rules:")
+        for rule in report['rules'][0:number_of_rules]:
+            print("{:<20} {:9.4f} s, checked {} times, matched {} times: {}".format(rule['rule_id'], rule['seconds'], rule['evaluations'], rule['hits'], rule['regex']))
         
-        # Keep track of which claim is shortest. This only checks independent claims since the shortest claim must be an independent claim.
-        if claim_len < shortest_indep_claim_len:
-            if args.debug:
-                print("Independent claim {} ({} characters) is shorter than claim {} ({} characters).".format(claim_number, claim_len, shortest_indep_claim_number_by_len, shortest_indep_claim_len))
-            
-            shortest_indep_claim_len = claim_len
-            shortest_indep_claim_number_by_len = claim_number
+        print()
+        print("Rules that never matched: {} of {}.".format(len([rule for rule in report['rules'] if rule['hits'] == 0]), len(report['rules'])))
+        print("Writing the profile to {}...".format(report_file))
         
-        # TODO: Support other claim types. MPEP 2106.03.
-        # Determine type of claim
-        if re.search("\\bmethod\\b", cleaned_claim_text) or re.search("\\bprocess\\b", cleaned_claim_text, flags=re.IGNORECASE):
-            indep_claim_types[claim_number] = 'method'
-            
-            # Check for "use" claims.
-            match_bool, match_str = re_matches(r"\b(step\b|\w*ing)", cleaned_claim_text)
-            
-            if not(match_bool):
-                warn("Claim {} is possibly a \"use\" claim. Check for steps. See MPEP 2173.05(q).".format(claim_number))
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+
+class Linter:
+    # Loads the warnings files once so that any number of documents can be linted without reloading them.
+    # The options are the same as the command line arguments, for example: Linter(ant_basis=True, filter=["112\\(f\\)"])
+    
+    def __init__(self, args=None, **options):
+        if args is None:
+            args = parser.parse_args([])
         else:
-            indep_claim_types[claim_number] = 'apparatus'
-    else:
-        # dependent claim
-        dependent = True
-        number_of_dep_claims += 1
+            args = copy.copy(args)
+        
+        for key in options:
+            assert hasattr(args, key), "Not a valid option: {}".format(key)
+            setattr(args, key, options[key])
+        
+        if args.nitpick:
+            args.ant_basis   = True
+            args.endings     = True
+            args.uspto       = True
+            args.restriction = True
+        
+        if args.debug:
+            args.verbose = True
+        
+        if args.restriction:
+            args.ant_basis = True
+        
+        if args.claims_warnings is None:
+            args.claims_warnings = default_warnings_file('claims')
         
-        assert_warn(cleaned_claim_text.startswith('The '), "Dependent claim {} does not start with 'The'. This is not required but is typical. See MPEP 608.01(m) for the requirements.".format(claim_number))
+        if args.format is None:
+            args.format = 'text'
         
-        if 'claims' in cleaned_claim_text.lower():
-            warn("Claim {} is possibly multiple dependent. Manually check validity. See MPEP 608.01(i).".format(claim_number))
+        # By default, only the rules of a warnings file given with -C are timed, as the rules of the bundled warnings files are known to be fast.
+        if not(args.rule_time_limit is None):
+            self.claim_rule_time_limit = args.rule_time_limit
+            self.title_rule_time_limit = args.rule_time_limit
+        elif os.path.realpath(args.claims_warnings) == default_warnings_file('claims'):
+            self.claim_rule_time_limit = None
+            self.title_rule_time_limit = None
         else:
-            try:
-                parent_claim_str = remove_punctuation(claim_words[claim_words.index('claim') + 1])
-                parent_claim = int(parent_claim_str)
-            except:
-                warn('Dependent claim {} possibly has invalid parent claim number: {}'.format(claim_number, parent_claim_str))
-                parent_claim = None
-            
-            assert_warn(not(parent_claim == claim_number), "Dependent claim {} depends on itself. Possible 112(d) rejection.".format(claim_number))
-            assert_warn(parent_claim < claim_number, "Dependent claim {} depends on claim {}, which is not a preceding claim. See MPEP 608.01(n).IV".format(claim_number, parent_claim))
-            assert_warn(parent_claim in claim_numbers, "Dependent claim {} depends on non-existent claim {}. Possible 112(d) rejection.".format(claim_number, parent_claim))
-            
-            parent_claims[claim_number] = parent_claim
+            self.claim_rule_time_limit = 1.0
+            self.title_rule_time_limit = None
+        
+        self.args = args
+        self.filter_regexes = compile_filters(args.filter)
+        self.warnings = get_warnings_file(args.claims_warnings, force=args.force, debug=args.debug, cache=not(args.no_cache))
+        self.suppressed_warnings = self.warnings.suppressed_rules(self.filter_regexes, claim_warning_format)
+        
+        # The title warnings are only loaded if a title is checked.
+        self.title_warnings = None
+        self.suppressed_title_warnings = None
+        
+        # Output sinks for the warnings and the marked claims during a lint.
+        self.output = None
+        self.marked_output = None
+        self.result = None
+        
+        # With --profile, the Profiler of the current lint.
+        self.profiler = None
+        
+        # Results of the slow per-claim steps from earlier lints. In verbose mode, every step is redone so that its output is printed, and with --profile, so that every step is timed.
+        if args.no_cache or args.verbose or not(args.profile is None):
+            self.claim_cache = None
+        else:
+            self.claim_cache = ClaimCache()
+        
+        # While a claim is being marked, the warnings given are also recorded here so that they can be cached.
+        self.recorded_warnings = None
+        
+        # The warnings file rules that took too long to check in the current lint, by rule ID with the regex. These rules are skipped for the rest of the lint. See RuleEngine.search().
+        self.timed_out_rules = {}
+    
+    def eprint(self, *args, **kwargs):
+        # Output other than warnings. In the JSON Lines format, each line of output is an "info" object. The SARIF format only has the warnings.
+        if self.args.format == 'text':
+            self.output.print(*args, **kwargs)
+        elif self.args.format == 'jsonl':
+            message = kwargs.get('sep', ' ').join(str(arg) for arg in args).strip()
+            if message != '':
+                self.output.print(json.dumps({'type': 'info', 'message': message}))
+    
+    def warn(self, message, dav_keyword=None, location=None, rule_id=None):
+        # The location, if any, is a dictionary with the file ('claims' or 'spec') and where in the file the warning applies. See claim_location().
+        # The rule ID is the ID of the warnings file rule (see RuleEngine) or the name of the check.
+        if not(self.recorded_warnings is None):
+            self.recorded_warnings.append([message, dav_keyword, location, rule_id])
+        
+        for filter_regex in self.filter_regexes:
+            if filter_regex.search(message):
+                return
+        
+        warning = {'message': message, 'dav_keyword': dav_keyword, 'location': location, 'rule_id': rule_id, 'mpep': mpep_regex.findall(message)}
+        self.result.warnings.append(warning)
+        
+        # In the JSON Lines format, each warning is written out as soon as it is found.
+        if self.args.format == 'text':
+            self.output.print(message)
+        elif self.args.format == 'jsonl':
+            record = {'type': 'warning'}
+            record.update(warning)
+            self.output.print(json.dumps(record))
+        
+        if not(dav_keyword is None) and not(dav_keyword in self.result.dav_keywords):
+            self.result.dav_keywords.add(dav_keyword)
     
-    if dependent:
-        assert not(parent_claim is None), "Parent claim undefined for dependent claim {}?".format(claim_number)
+    def assert_warn(self, bool_input, message, dav_keyword=None, location=None, rule_id=None):
+        if not bool_input:
+            self.warn(message, dav_keyword=dav_keyword, location=location, rule_id=rule_id)
     
-    if args.debug:
-        print("Going through claim warnings...")
+    def profile(self, stage):
+        # Times a stage of linting with --profile. See Profiler.
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        else:
+            return self.profiler.stage(stage)
+
+    def mark_new_element_punctuation(self, claim_text, claim_number):
+        claim_text = mark_element_punctuation(claim_text, claim_number, "{", "}", "Curly bracket")
+        
+        if self.args.debug:
+            print("New element punctuation marking completed:", claim_text)
+        
+        return claim_text
     
-    if args.verbose:
-        print("Claim {} as being checked for warnings:".format(claim_number), cleaned_claim_text)
+    def mark_old_element_punctuation(self, claim_text, claim_number):
+        claim_text = mark_element_punctuation(claim_text, claim_number, "[", "]", "Square bracket")
+        
+        if self.args.debug:
+            print("Old element punctuation marking completed:", claim_text)
+        
+        return claim_text
     
-    # Do some checks that will have many false positives.
-    if args.endings:
-        # Check for adverbs.
-        # <https://medium.com/analysts-corner/six-tips-for-writing-unambiguous-requirements-70bad5422427>
-        possible_adverbs_iter = re.finditer(r"\b\w*ly\b", cleaned_claim_text, flags=re.IGNORECASE)
+    def mark_claim_text(self, claim_text, claim_number, element_trie=None):
+        # element_trie has the claim elements introduced in the parent claims, if any.
+        if self.args.debug:
+            print("Input claim text:", claim_text)
+            print("Marking plural claim element starting terms...")
+        
+        # Remove character that adds text to claims for the antecedent basis checker to make antecedent basis work.
+        claim_text = claim_text.replace("`", "")
+        
+        # Add a period at the end of the claim if a period is absent. Otherwise, the parsing won't work properly.
+        if not claim_text.endswith('.'):
+            claim_text = claim_text + '.'
+        
+        # Mark plural claim element starting terms. This is hacky, but should work.
+        # Note that plural claim element starting terms act differently than singular claim element starting terms like "a" or "an". For plurals, the claim element starting term itself becomes part of the claim element.
+        # Other plural terms already handled as they start with a or an: a plurality, a number of
+        
+        # All of the plural claim element starting terms are marked in one pass. The regex only matches the empty string before each term, so overlapping terms like 'two or more than one' are both marked, and 'two or more' is marked once rather than also as 'two'.
+        # Plural starting terms prefixed with the, said, [, {, or # are not marked. (# will be ignored.)
+        claim_text = plural_starting_term_regex.sub("{", claim_text)
+        
+        if self.args.debug:
+            print("Marking singular claim element starting terms...")
+        
+        # Mark "a"
+        claim_text = re.sub("\\bA \\b", "A {", claim_text)
+        claim_text = re.sub("\\ba \\b", "a {", claim_text)
+        
+        # Mark "an"
+        claim_text = re.sub("\\bAn \\b", "An {", claim_text)
+        claim_text = re.sub("\\ban \\b", "an {", claim_text)
+        
+        # Mark "the"
+        claim_text = re.sub("\\bThe \\b", "The [", claim_text)
+        claim_text = re.sub("\\bthe \\b", "the [", claim_text)
+        
+        # Mark "said"
+        claim_text = re.sub("\\bSaid \\b", "Said [", claim_text)
+        claim_text = re.sub("\\bsaid \\b", "said [", claim_text)
+        
+        # Remove markings for commented out terms.
+        claim_text = re.sub("\#A \{", "A ", claim_text)
+        claim_text = re.sub("\#a \{", "a ", claim_text)
+        claim_text = re.sub("\#An \{", "An ", claim_text)
+        claim_text = re.sub("\#an \{", "an ", claim_text)
+        claim_text = re.sub("\#The \[", "The ", claim_text)
+        claim_text = re.sub("\#the \[", "the ", claim_text)
+        claim_text = re.sub("\#Said \[", "Said ", claim_text)
+        claim_text = re.sub("\#said \[", "said ", claim_text)
+        
+        if self.args.debug:
+            print("Claim text after automatically marking starting terms:", claim_text)
+            print("Turning punctuation marks and vertical pipes into claim element endings...")
+        
+        # Mark new claim elements based on punctuation and the marking notation.
+        claim_text = self.mark_new_element_punctuation(claim_text, claim_number)
+        
+        # By this point all the new elements should be marked.
+        assert claim_text.count("{") == claim_text.count("}"), "Error in marking of new claim elements. Number of left curly brackets does not match number of right curly brackets."
         
-        for possible_adverb_iter in possible_adverbs_iter:
-            possible_adverb = possible_adverb_iter.group()
+        # Automatically mark old elements with corresponding new elements.
+        if not self.args.manual_marking:
+            if element_trie is None:
+                element_trie = ElementTrie()
             
-            # To reduce false positives, allow certain -ing words that aren't adverbs.
-            if possible_adverb in {'assembly', 'supply', 'apply', 'only', 'family', 'likely', 'fly', 'imply', 'comply', 'bodily', 'multiply', 'poly', 'reply', 'rely', 'respectively'}:
-                continue
+            new_elements = re.finditer(r"\{.*?\}", claim_text, flags=re.IGNORECASE)
+            
+            element_trie = element_trie.extended([new_element_iter.group()[1:-1] for new_element_iter in new_elements])
+            
+            # Each "[" is followed by the longest claim element that the text after it starts with. Consider the elements "coolant" and "coolant flow path". "[coolant flow path" needs to become "[coolant flow path]" and not "[coolant] flow path".
+            marked_text = []
+            loc = 0
+            old_element_start = claim_text.find('[')
+            while old_element_start != -1:
+                old_element_start += 1
+                matching_elements = element_trie.matches(claim_text, old_element_start)
+                
+                if matching_elements:
+                    new_element = matching_elements[-1]
+                    
+                    if self.args.debug:
+                        print("Automatically marking old element: {}".format(new_element))
+                    
+                    # Mark old claim elements corresponding to new claim elements.
+                    old_element_end = old_element_start + len(new_element)
+                    marked_text.append(claim_text[loc:old_element_end])
+                    marked_text.append(']')
+                    loc = old_element_end
+                
+                old_element_start = claim_text.find('[', old_element_start)
+            
+            claim_text = "".join(marked_text)+claim_text[loc:]
             
-            warn('Claim {} recites "{}". Possible adverb. Adverbs are frequently ambiguous.'.format(claim_number, possible_adverb), dav_keyword=possible_adverb)
+            if element_trie.root:
+                # Remove extra ']' for old claim elements already marked.
+                claim_text = claim_text.replace(']]', ']')
+                claim_text = claim_text.replace(']|', ']')
         
-        # Check for present participle phrases, which could indicate likely functional language.
-        # <https://www.ssiplaw.com/112f-has-a-hair-trigger-avoiding-means-plus-function-misfires/>
-        possible_functional_terms_iter = re.finditer(r"\b\w*ing\b", cleaned_claim_text, flags=re.IGNORECASE)
+        # Remove the character used to not mark words as this isn't helpful in the .marked file.
+        claim_text = claim_text.replace('#', '')
         
-        for possible_functional_term_iter in possible_functional_terms_iter:
-            possible_functional_term = possible_functional_term_iter.group()
-            
-            # To reduce false positives, allow certain -ing words that aren't functional.
-            if possible_functional_term in {'comprising', 'including', 'casing', 'having', 'consisting', 'containing', 'opening', 'during', 'according', 'providing', 'ring'}:
-                continue
+        if self.args.verbose:
+            print("Claim {} marked: {}".format(claim_number, claim_text))
+        
+        claim_text = self.mark_old_element_punctuation(claim_text, claim_number)
+        claim_text = check_marking(claim_text, claim_number)
+        
+        assert claim_text.count("[") == claim_text.count("]"), "Error in marking of old claim elements. Number of left square brackets does not match number of right square brackets."
+        assert not("|" in claim_text), "Error in marking of end of a claim element. Look for '|' by itself in the marked claim."
+        
+        return claim_text
+    
+    def search_rules(self, rule_engine, text, dependent=True, skip=(), time_limit=None):
+        # Searches the text with the rules of a warnings file like RuleEngine.search(), skipping the rules that took too long earlier in this lint and reporting the rules that take too long now.
+        number_timed_out = len(self.timed_out_rules)
+        matched_rules = rule_engine.search(text, dependent=dependent, debug=self.args.debug, skip=skip, profiler=self.profiler, time_limit=time_limit, timed_out_rules=self.timed_out_rules)
+        
+        for rule_id in list(self.timed_out_rules)[number_timed_out:]:
+            self.eprint('Skipping rule {} for the rest of this lint, which took more than {} seconds to check on the text "{}...": {}'.format(rule_id, time_limit, text[0:60], self.timed_out_rules[rule_id]))
+        
+        return matched_rules
+    
+    def report_skipped_rules(self, rule_engine):
+        for rule_index in rule_engine.skipped_rules:
+            self.eprint("Skipping rule {}, which {}: {}".format(rule_engine.rule_ids[rule_index], rule_engine.skipped_rules[rule_index], rule_engine.rules[rule_index][0].pattern))
+    
+    def cached_rule_matches(self, cleaned_claim_text, dependent):
+        # The (rule ID, matched text, start, end, message) of each warnings file rule matching the claim, using the claim cache.
+        rule_matches = None
+        if not(self.claim_cache is None):
+            rule_matches_key = self.claim_cache.key('rules', self.warnings.digest, sorted(self.suppressed_warnings), dependent, cleaned_claim_text)
+            rule_matches = self.claim_cache.get(rule_matches_key)
+        
+        if rule_matches is None:
+            rule_matches = [(rule_id, match.group(), match.start(), match.end(), warning_message) for rule_id, match, warning_message in self.search_rules(self.warnings, cleaned_claim_text, dependent=dependent, skip=self.suppressed_warnings, time_limit=self.claim_rule_time_limit)]
             
-            warn('Claim {} recites "{}". Possible functional language due to present participle wording.'.format(claim_number, possible_functional_term), dav_keyword=possible_functional_term)
+            # Once a rule has taken too long in this lint, the rule matches are missing that rule and aren't cached.
+            if not(self.claim_cache is None) and (len(self.timed_out_rules) == 0):
+                self.claim_cache.put(rule_matches_key, rule_matches)
+        
+        return rule_matches
+    
+    def precompute_claims(self, claims):
+        # Works out the warnings file rule matches and the marking of each claim of one independent claim family, in claim order, and returns them as claim cache entries. This runs in a worker process for --jobs (see precompute_family()).
+        # The claim elements of each claim are found the same way as in check_claims(), as the marking of a dependent claim depends on the claim elements of its parent claims.
+        # Claims that can't be worked out here, for example because they depend on a claim outside of the family, are left for check_claims(). An error stops the family, and check_claims() will give the same error in order.
+        self.claim_cache = ClaimCache()
+        self.result = LintResult()
+        self.output = OutputSink()
+        self.timed_out_rules = {}
+        
+        element_scopes = {}
+        element_tries = {}
+        try:
+            for claim in claims:
+                self.cached_rule_matches(claim.cleaned_text, claim.dependent)
+                
+                if not(self.args.ant_basis):
+                    continue
+                
+                if claim.dependent:
+                    if claim.multiple_dependent or (len(claim.parents) == 0) or not(claim.parents[0] in element_scopes):
+                        continue
+                    
+                    new_elements = ElementScope(claim.number, element_scopes[claim.parents[0]])
+                    element_trie = element_tries[claim.parents[0]]
+                else:
+                    new_elements = ElementScope(claim.number)
+                    element_trie = ElementTrie()
+                
+                marked_claim_text = self.cached_mark_claim_text(claim.text, claim.number, element_trie, new_elements.parent)
+                
+                for new_element_iter in re.finditer(r"\{.*?\}", marked_claim_text, flags=re.IGNORECASE):
+                    new_element = new_element_iter.group()[1:-1]
+                    if not(new_element in new_elements):
+                        new_elements.add(new_element, new_element_iter.start())
+                
+                element_scopes[claim.number] = new_elements
+                element_tries[claim.number] = element_trie.extended(new_elements.positions)
+        except AssertionError:
+            pass
+        
+        return self.claim_cache.used_entries
+    
+    def precompute_claims_in_parallel(self, claims):
+        # Splits the claims into independent claim families and works out the slow steps of each family in a pool of self.args.jobs worker processes. The results go into a claim cache, so check_claims() then checks the claims in order as usual with that cache, and the output is the same as without --jobs.
+        # Returns the claims to check and the claim cache with the results. That is the claim cache of the Linter if it has one, and otherwise a claim cache only for checking these claims, so that --no-cache still doesn't keep any results between lints.
+        # The claims are all read first. If reading the claims fails, the claims read are still checked before the error is raised again.
+        read_claims = []
+        read_error = None
+        try:
+            for claim in claims:
+                read_claims.append(claim)
+        except AssertionError as e:
+            read_error = e
+        
+        families = {}
+        for claim in read_claims:
+            indep_claim = self.result.claim_graph.independent_claims[claim.number]
+            if not(indep_claim is None):
+                families.setdefault(indep_claim, []).append(claim)
+        
+        # The largest families are started first so that the workers finish at about the same time.
+        family_list = sorted(families.values(), key=len, reverse=True)
+        
+        if self.claim_cache is None:
+            claim_cache = ClaimCache()
+        else:
+            claim_cache = self.claim_cache
+        
+        if len(family_list) > 1:
+            with multiprocessing.Pool(processes=min(self.args.jobs, len(family_list))) as pool:
+                for entries in pool.imap_unordered(precompute_family, [(family, self.args) for family in family_list]):
+                    for key in entries:
+                        claim_cache.put(key, entries[key])
+        
+        return claims_then_error(read_claims, read_error), claim_cache
     
-    for warning in warnings:
-        if args.debug:
-            print("Trying regex:", warning['regex'])
+    def cached_mark_claim_text(self, claim_text, claim_number, element_trie, parent_elements):
+        # mark_claim_text() using the claim cache. The marking depends on the claim elements of the parent claims, parent_elements, which is None for an independent claim.
+        if self.claim_cache is None:
+            return self.mark_claim_text(claim_text, claim_number, element_trie)
         
-        # For independent claims, skip warnings that only apply to dependent claims.
-        if not(dependent):
-            if ('112(d)' in warning['message']) or ('DEPONLY' in warning['message']) :
-                continue
+        if parent_elements is None:
+            parent_element_list = []
+        else:
+            parent_element_list = sorted(parent_elements)
         
-        match_bool, match_str = re_matches(warning['regex'], cleaned_claim_text)
-        message = 'Claim {} recites "{}". {}'.format(claim_number, match_str, warning['message'].split('#')[0].strip())
-        assert_warn(not(match_bool), message, dav_keyword=match_str)
+        marking_key = self.claim_cache.key('marking', claim_number, claim_text, parent_element_list, self.args.manual_marking)
+        marking = self.claim_cache.get(marking_key)
+        
+        if marking is None:
+            self.recorded_warnings = []
+            try:
+                marked_claim_text = self.mark_claim_text(claim_text, claim_number, element_trie)
+                self.claim_cache.put(marking_key, [marked_claim_text, self.recorded_warnings])
+            finally:
+                self.recorded_warnings = None
+        else:
+            marked_claim_text, marking_warnings = marking
+            for message, dav_keyword, location, rule_id in marking_warnings:
+                self.warn(message, dav_keyword=dav_keyword, location=location, rule_id=rule_id)
+        
+        return marked_claim_text
     
-    if args.ant_basis:
-        if args.debug:
-            print("Checking claim {} for antecedent basis issues...".format(claim_number))
+    def lint(self, claims_text, spec=None, title=None, claims_file=None, output=None, marked_output=None):
+        # Lint the text of the claims (or a file of claims), and optionally the text of the specification (or a SpecDocument of it) and the title.
+        # The warnings are written to the OutputSink output and the marked claims for the antecedent basis analysis to the OutputSink marked_output.
+        # By default, the warnings go to stderr. If the name of the claims file is given, the default is instead to write the marked claims to {claims_file}.marked and, with the outfile option, the warnings to {claims_file}.out.
         
-        # Import new elements from parent claims.
-        if dependent:
-            if args.debug:
-                print("Importing new claim elements from claim {} for claim {}...".format(parent_claim, claim_number))
-                print(new_elements_in_claims[parent_claim])
-            
-            new_elements_dict = {}
-            for new_element in new_elements_in_claims[parent_claim]:
-                new_elements_dict[new_element] = 0
-            
-            #new_elements_dict = copy.deepcopy(new_elements_in_claims[parent_claim])
-            new_elements_set = set(new_elements_dict.keys())
+        opened_sinks = []
+        
+        if not(output is None):
+            self.output = output
+        elif self.args.outfile and not(claims_file is None):
+            self.output = OutputSink(file_name=claims_file+'.out')
+            opened_sinks.append(self.output)
         else:
-            new_elements_set = set()
-            new_elements_dict = {}
+            self.output = OutputSink(sys.stderr)
         
-        if args.verbose:
-            print("Marking claim {}...".format(claim_number))
+        if not(marked_output is None):
+            self.marked_output = marked_output
+        elif self.args.ant_basis and not(claims_file is None):
+            self.marked_output = OutputSink(file_name=claims_file+'.marked')
+            opened_sinks.append(self.marked_output)
+        else:
+            self.marked_output = None
         
-        new_elements_set_2 = copy.deepcopy(new_elements_set)
-        marked_claim_text = mark_claim_text(claim_text, claim_number, new_elements_set_2)
+        # With --claim-cache, the claim cache of a claims file is kept in a file so that the next run on the same claims file can use it. Otherwise, the claim cache only lasts as long as the Linter, for example in watch mode.
+        if not(self.claim_cache is None) and not(claims_file is None) and self.args.claim_cache:
+            cache_file = claim_cache_file(claims_file)
+            if self.claim_cache.file_name != cache_file:
+                self.claim_cache = ClaimCache(cache_file)
         
-        with open(args.claims+'.marked', 'a') as f:
-            f.write("{}. {}\n\n".format(claim_number, marked_claim_text.replace('; ', ';\n').replace(': ', ':\n')))
+        if self.args.profile is None:
+            self.profiler = None
+        else:
+            self.profiler = Profiler()
+            self.profiler.add_rules(self.warnings, 'claim rules')
         
-        # Get new and old elements in this claim.
-        new_elements = re.finditer(r"\{.*?\}", marked_claim_text, flags=re.IGNORECASE)
-        old_elements = re.finditer(r"\[.*?\]", marked_claim_text, flags=re.IGNORECASE)
+        self.timed_out_rules = {}
         
-        for new_element_iter in new_elements:
-            new_element = new_element_iter.group()[1:-1]
+        # Close the files even if linting stops at an error, so that the output up to the error is written.
+        try:
+            # The time not in any other stage, for example reading the claims, is in the stage "other".
+            with self.profile('other'):
+                result = self.run_checks(claims_text, spec, title)
             
-            # Check if claim element is defined twice, for example, claim 1 introduces "a fastener" and claim 2 also introduces "a fastener", but it is unclear if claim 2 should have said "the fastener". Examples: App. nos. 16162122 and 16633492.
-            message = 'Claim {} introduces "{}" more than once. Unclear if the "{}" is the same in both instances. Possible antecedent basis issue.'.format(claim_number, new_element, new_element)
-            assert_warn(not(new_element in new_elements_set), message, dav_keyword=new_element)
+            result.profile = self.profiler
             
-            if not(new_element in new_elements_set):
-                new_elements_set.add(new_element)
-                new_elements_dict[new_element] = new_element_iter.start()
-                for term_that_should_not_be_in_claim_element in terms_that_should_not_be_in_claim_element:
-                    matches, match_str = re_matches(term_that_should_not_be_in_claim_element, new_element)
-                    assert_warn(not(matches), 'Claim element "{}" contains a term that should not appear in claim elements: "{}". Likely a mistake was made in marking the claim elements.'.format(new_element, match_str))
-                assert_warn(len(new_element) < long_claim_element_limit, 'Claim element "{}" is over {} characters. Likely a mistake was made in marking the claim elements.'.format(new_element, long_claim_element_limit))
-        
-        for old_element_iter in old_elements:
-            old_element = old_element_iter.group()[1:-1]
-            old_element_index = old_element_iter.start()
+            if not(self.claim_cache is None):
+                self.claim_cache.finish()
             
-            ab_bool = False
-            for new_element in new_elements_set:
-                new_element_index = new_elements_dict[new_element]
+            if self.args.format == 'sarif':
+                # The claims text gives the regions of the warnings about claims. Claims read from a file as they were checked are read again.
+                if isinstance(claims_text, str):
+                    sarif_claims_text = claims_text
+                elif not(claims_file is None):
+                    with open(claims_file) as claim_file:
+                        sarif_claims_text = claim_file.read()
+                else:
+                    sarif_claims_text = None
                 
-                if old_element == new_element:
-                    if new_element_index < old_element_index:
-                        ab_bool = True
-                        break
-            
-            message = 'Claim {} recites "{}", which possibly lacks antecedent basis. See MPEP 2173.05(e).'.format(claim_number, old_element)
-            assert_warn(ab_bool, message, dav_keyword=old_element)
+                if claims_file is None:
+                    claims_file = 'claims'
+                
+                spec_file = self.args.spec
+                if spec_file is None:
+                    spec_file = 'spec'
+                
+                self.output.print(json.dumps(sarif_log(result, claims_file, spec_file, sarif_claims_text), indent=2))
             
-            for term_that_should_not_be_in_claim_element in terms_that_should_not_be_in_claim_element:
-                matches, match_str = re_matches(term_that_should_not_be_in_claim_element, old_element)
-                assert_warn(not(matches), 'Claim element "{}" contains a term that should not appear in claim elements: "{}". Likely a mistake was made in marking the claim elements.'.format(old_element, match_str))
-                assert_warn(len(new_element) < long_claim_element_limit, 'Claim element "{}" is over {} characters. Likely a mistake was made in marking the claim elements.'.format(new_element, long_claim_element_limit))
+            return result
+        finally:
+            for opened_sink in opened_sinks:
+                opened_sink.close()
+    
+    def run_checks(self, claims_text, spec, title):
+        self.result = LintResult()
+        
+        self.report_skipped_rules(self.warnings)
+        
+        if not title is None:
+            with self.profile('title rules'):
+                self.check_title(title)
+        
+        if not(spec is None) and not(isinstance(spec, SpecDocument)):
+            with self.profile('spec scans'):
+                spec = SpecDocument(spec)
+        
+        if not spec is None:
+            with self.profile('spec scans'):
+                self.check_spec_definitions(spec)
+        
+        claims = self.split_claims(claims_text)
         
-        new_elements_in_claims[claim_number] = new_elements_dict
+        # In verbose mode, everything is done in order so that the output is in order. With --profile, the claims are checked in this process so that every step is timed.
+        if not(self.args.jobs is None) and (self.args.jobs > 1) and not(self.args.verbose) and (self.profiler is None):
+            claims, claim_cache = self.precompute_claims_in_parallel(claims)
+            self.check_claims(claims, claim_cache)
+        else:
+            self.check_claims(claims)
+        
+        if (not spec is None) and self.args.ant_basis:
+            with self.profile('spec scans'):
+                self.check_spec_elements(spec)
+        
+        self.check_least_restrictive()
+        
+        if self.args.uspto:
+            dav_search_string = self.result.dav_search_string()
+            if dav_search_string != "":
+                self.eprint("\nDAV claims viewer search string:", dav_search_string)
+        
+        if self.args.restriction:
+            with self.profile('restriction'):
+                self.check_restriction(spec)
+        
+        if self.args.uspto:
+            self.check_attribute_time()
+        
+        assert(self.result.number_of_indep_claims == len(self.result.indep_claims))
+        
+        assert self.result.number_of_claims == (self.result.number_of_indep_claims + self.result.number_of_dep_claims)
+        
+        return self.result
     
-    prev_claim_number = claim_number
-
-if args.debug and args.ant_basis:
-    for claim_number in claim_numbers:
-        print("New elements in claim {}:".format(claim_number), new_elements_in_claims[claim_number])
-
-if args.spec and args.ant_basis:
-    all_elements = set()
-    for claim_number in claim_numbers:
-        for element in new_elements_in_claims[claim_number]:
-            #print(claim_number, element)
-            all_elements.add(element)
+    def check_title(self, title):
+        title = title.strip()
+        
+        if self.title_warnings is None:
+            self.title_warnings = get_warnings_file(default_warnings_file('title'), force=self.args.force, debug=self.args.debug, cache=not(self.args.no_cache))
+            self.suppressed_title_warnings = self.title_warnings.suppressed_rules(self.filter_regexes, title_warning_format)
+        
+        self.report_skipped_rules(self.title_warnings)
+        
+        if not(self.profiler is None):
+            self.profiler.add_rules(self.title_warnings, 'title rules')
+        
+        self.assert_warn(len(title) <= 500, "The title is {} characters long. The maximum title length under 37 CFR 1.72 is 500 characters. See MPEP 606.".format(len(title)), rule_id='title-length')
+        
+        for rule_id, match, title_message in self.search_rules(self.title_warnings, title, skip=self.suppressed_title_warnings, time_limit=self.title_rule_time_limit):
+            self.warn(title_warning_format.format(match.group(), title_message), rule_id=rule_id)
+    
+    def check_spec_definitions(self, spec):
+        # Check for lexicographic definitions.
+        
+        # Run the regex over the whole spec once. Highlight the first matching phrase in each sentence.
+        prev_sentence_span = None
+        for result in lexicographic_definition_regex.finditer(spec.text):
+            sentence_span = spec.sentence_span(result.start())
+            
+            if (sentence_span is None) or (sentence_span == prev_sentence_span):
+                continue
+            
+            prev_sentence_span = sentence_span
+            
+            sentence_start, sentence_end = sentence_span
+            quote = spec.text[sentence_start:result.start()]+'*****'+result.group()+'*****'+spec.text[result.end():sentence_end]
+            self.warn("Spec. quote with possible lexicographic definition: {}.".format(quote), location=spec_location(spec, result.start()), rule_id='spec-definition')
+    
+    def split_claims(self, claims_text):
+        # Returns a generator of the Claim records of the claims text, or of a file of claims, adding each claim to the claim graph of the result as it is read.
+        if self.args.debug:
+            print("Constructing list with text of claims including number...")
+        
+        if isinstance(claims_text, str):
+            claims_text = io.StringIO(claims_text)
+        
+        return parse_claims(claims_text, self.result.claim_graph)
     
-    spec_appearances_of_element = {}
-    for element in all_elements:
-        spec_appearances_of_element[element] = 0
+    def check_claims(self, claims, claim_cache=None):
+        # If a claim cache is given, it is used instead of the claim cache of the Linter while checking these claims.
+        if claim_cache is None:
+            self.check_claims_with_cache(claims)
+        else:
+            linter_claim_cache = self.claim_cache
+            self.claim_cache = claim_cache
+            try:
+                self.check_claims_with_cache(claims)
+            finally:
+                self.claim_cache = linter_claim_cache
     
-    with open(args.spec, "r", encoding="utf-8") as spec_file:
-        line = spec_file.readline()
+    def check_claims_with_cache(self, claims):
+        result = self.result
         
-        while line:
-            line = line.replace('\n', '')
+        if self.args.debug:
+            print("Processing the claims list...")
+        
+        if not(self.marked_output is None) and not(self.marked_output.file_name is None):
+            print("Writing marked claims to {}...".format(self.marked_output.file_name))
+        
+        prev_claim_number = 0
+        
+        # Tries of the claim elements introduced in each claim and its parent claims, by claim number.
+        element_tries = {}
+        
+        for claim in claims:
+            claim_number = claim.number
+            claim_text = claim.text
+            cleaned_claim_text = claim.cleaned_text
+            
+            if not(self.args.to_claim is None):
+                if claim_number > self.args.to_claim:
+                    self.eprint("Not all claims were analyzed. Stopping at claim {}.".format(self.args.to_claim))
+                    if not(self.output.file_name is None):
+                        print("Not all claims were analyzed. Stopping at claim {}.".format(self.args.to_claim))
+                    break
+            
+            result.number_of_claims += 1
+            result.claim_numbers.add(claim_number)
+            
+            if result.lowest_claim_number == 0:
+                result.lowest_claim_number = claim_number
+            
+            assert not(claim_number == prev_claim_number), 'There are multiple of claim {}.'.format(claim_number)
+            
+            assert claim_number > prev_claim_number, 'Claim {} is out of order'.format(claim_number)
+            
+            self.assert_warn(cleaned_claim_text.endswith('.'), 'Claim {} does not end with a period. See MPEP 608.01(m).'.format(claim_number), location=claim_location(claim_number), rule_id='claim-period')
+            
+            claim_len = len(cleaned_claim_text)
+            if self.args.debug:
+                print("Length of claim {}: {} characters.".format(claim_number, claim_len))
+            
+            parent_claim = None
+            
+            if not(claim.dependent):
+                # independent claim
+                dependent = False
+                result.number_of_indep_claims += 1
+                
+                result.indep_claims.add(claim_number)
+                
+                self.assert_warn(cleaned_claim_text.startswith('A ') or cleaned_claim_text.startswith('An '), "Independent claim {} does not start with 'A' or 'An'. This is not required but is typical. See MPEP 608.01(m) for the requirements.".format(claim_number), location=claim_location(claim_number), rule_id='independent-claim-start')
+                
+                # Keep track of which claim is shortest. This only checks independent claims since the shortest claim must be an independent claim.
+                if claim_len < result.shortest_indep_claim_len:
+                    if self.args.debug:
+                        print("Independent claim {} ({} characters) is shorter than claim {} ({} characters).".format(claim_number, claim_len, result.shortest_indep_claim_number_by_len, result.shortest_indep_claim_len))
+                    
+                    result.shortest_indep_claim_len = claim_len
+                    result.shortest_indep_claim_number_by_len = claim_number
+                
+                # TODO: Support other claim types. MPEP 2106.03.
+                # Determine type of claim
+                if re.search("\\bmethod\\b", cleaned_claim_text) or re.search("\\bprocess\\b", cleaned_claim_text, flags=re.IGNORECASE):
+                    result.indep_claim_types[claim_number] = 'method'
+                    
+                    # Check for "use" claims.
+                    match_bool, match_str = re_matches(r"\b(step\b|\w*ing)", cleaned_claim_text)
+                    
+                    if not(match_bool):
+                        self.warn("Claim {} is possibly a \"use\" claim. Check for steps. See MPEP 2173.05(q).".format(claim_number), location=claim_location(claim_number), rule_id='use-claim')
+                else:
+                    result.indep_claim_types[claim_number] = 'apparatus'
+            else:
+                # dependent claim
+                dependent = True
+                result.number_of_dep_claims += 1
+                
+                self.assert_warn(cleaned_claim_text.startswith('The '), "Dependent claim {} does not start with 'The'. This is not required but is typical. See MPEP 608.01(m) for the requirements.".format(claim_number), location=claim_location(claim_number), rule_id='dependent-claim-start')
+                
+                if claim.multiple_dependent:
+                    self.warn("Claim {} is possibly multiple dependent. Manually check validity. See MPEP 608.01(i).".format(claim_number), location=claim_location(claim_number), rule_id='multiple-dependent')
+                elif len(claim.parents) == 0:
+                    self.warn('Dependent claim {} possibly has invalid parent claim number: {}'.format(claim_number, claim.parent_text), location=claim_location(claim_number), rule_id='invalid-parent')
+                else:
+                    parent_claim = claim.parents[0]
+                    
+                    self.assert_warn(not(parent_claim == claim_number), "Dependent claim {} depends on itself. Possible 112(d) rejection.".format(claim_number), location=claim_location(claim_number), rule_id='self-dependent')
+                    self.assert_warn(parent_claim < claim_number, "Dependent claim {} depends on claim {}, which is not a preceding claim. See MPEP 608.01(n).IV".format(claim_number, parent_claim), location=claim_location(claim_number), rule_id='parent-not-preceding')
+                    self.assert_warn(parent_claim in result.claim_numbers, "Dependent claim {} depends on non-existent claim {}. Possible 112(d) rejection.".format(claim_number, parent_claim), location=claim_location(claim_number), rule_id='parent-nonexistent')
+                    
+                    result.parent_claims[claim_number] = parent_claim
+            
+            if dependent:
+                assert not(parent_claim is None), "Parent claim undefined for dependent claim {}?".format(claim_number)
+            
+            if self.args.debug:
+                print("Going through claim warnings...")
             
-            for element in all_elements:
-                if element in line:
-                    spec_appearances_of_element[element] += line.count(element)
+            if self.args.verbose:
+                print("Claim {} as being checked for warnings:".format(claim_number), cleaned_claim_text)
             
-            # Advance line
-            line = spec_file.readline()
+            # Do some checks that will have many false positives.
+            if self.args.endings:
+                with self.profile('endings'):
+                    # Check for adverbs.
+                    # <https://medium.com/analysts-corner/six-tips-for-writing-unambiguous-requirements-70bad5422427>
+                    possible_adverbs_iter = re.finditer(r"\b\w*ly\b", cleaned_claim_text, flags=re.IGNORECASE)
+                    
+                    for possible_adverb_iter in possible_adverbs_iter:
+                        possible_adverb = possible_adverb_iter.group()
+                        
+                        # To reduce false positives, allow certain -ing words that aren't adverbs.
+                        if possible_adverb in {'assembly', 'supply', 'apply', 'only', 'family', 'likely', 'fly', 'imply', 'comply', 'bodily', 'multiply', 'poly', 'reply', 'rely', 'respectively'}:
+                            continue
+                        
+                        self.warn('Claim {} recites "{}". Possible adverb. Adverbs are frequently ambiguous.'.format(claim_number, possible_adverb), dav_keyword=possible_adverb, location=claim_location(claim_number, possible_adverb_iter.start(), possible_adverb_iter.end()), rule_id='adverb')
+                    
+                    # Check for present participle phrases, which could indicate likely functional language.
+                    # <https://www.ssiplaw.com/112f-has-a-hair-trigger-avoiding-means-plus-function-misfires/>
+                    possible_functional_terms_iter = re.finditer(r"\b\w*ing\b", cleaned_claim_text, flags=re.IGNORECASE)
+                    
+                    for possible_functional_term_iter in possible_functional_terms_iter:
+                        possible_functional_term = possible_functional_term_iter.group()
+                        
+                        # To reduce false positives, allow certain -ing words that aren't functional.
+                        if possible_functional_term in {'comprising', 'including', 'casing', 'having', 'consisting', 'containing', 'opening', 'during', 'according', 'providing', 'ring'}:
+                            continue
+                        
+                        self.warn('Claim {} recites "{}". Possible functional language due to present participle wording.'.format(claim_number, possible_functional_term), dav_keyword=possible_functional_term, location=claim_location(claim_number, possible_functional_term_iter.start(), possible_functional_term_iter.end()), rule_id='present-participle')
+                
+            with self.profile('claim rules'):
+                rule_matches = self.cached_rule_matches(cleaned_claim_text, dependent)
+            
+            for rule_id, match_str, match_start, match_end, warning_message in rule_matches:
+                message = claim_warning_format.format(claim_number, match_str, warning_message)
+                self.warn(message, dav_keyword=match_str, location=claim_location(claim_number, match_start, match_end), rule_id=rule_id)
+            
+            if self.args.ant_basis:
+                if not(self.profiler is None):
+                    self.profiler.start('antecedent basis')
+                
+                if self.args.debug:
+                    print("Checking claim {} for antecedent basis issues...".format(claim_number))
+                
+                # Import new elements from parent claims. A parent claim that doesn't exist or comes later has no claim elements yet, so none are imported.
+                if dependent and not(parent_claim in result.new_elements_in_claims):
+                    self.warn("Claim elements of claim {} not imported for dependent claim {}, as claim {} does not precede claim {}. Antecedent basis in claim {} is checked as if it were independent.".format(parent_claim, claim_number, parent_claim, claim_number, claim_number), location=claim_location(claim_number), rule_id='parent-elements-missing')
+                    new_elements = ElementScope(claim_number)
+                    element_trie = ElementTrie()
+                elif dependent:
+                    if self.args.debug:
+                        print("Importing new claim elements from claim {} for claim {}...".format(parent_claim, claim_number))
+                        print(result.new_elements_in_claims[parent_claim])
+                    
+                    new_elements = ElementScope(claim_number, result.new_elements_in_claims[parent_claim])
+                    element_trie = element_tries[parent_claim]
+                else:
+                    new_elements = ElementScope(claim_number)
+                    element_trie = ElementTrie()
+                
+                if self.args.verbose:
+                    print("Marking claim {}...".format(claim_number))
+                
+                with self.profile('marking'):
+                    marked_claim_text = self.cached_mark_claim_text(claim_text, claim_number, element_trie, new_elements.parent)
+                
+                result.marked_claims[claim_number] = marked_claim_text
+                
+                if not(self.marked_output is None):
+                    self.marked_output.write("{}. {}\n\n".format(claim_number, marked_claim_text.replace('; ', ';\n').replace(': ', ':\n')))
+                
+                # Get new and old elements in this claim.
+                new_elements_iter = re.finditer(r"\{.*?\}", marked_claim_text, flags=re.IGNORECASE)
+                old_elements = re.finditer(r"\[.*?\]", marked_claim_text, flags=re.IGNORECASE)
+                
+                for new_element_iter in new_elements_iter:
+                    new_element = new_element_iter.group()[1:-1]
+                    
+                    # Check if claim element is defined twice, for example, claim 1 introduces "a fastener" and claim 2 also introduces "a fastener", but it is unclear if claim 2 should have said "the fastener". Examples: App. nos. 16162122 and 16633492.
+                    message = 'Claim {} introduces "{}" more than once. Unclear if the "{}" is the same in both instances. Possible antecedent basis issue.'.format(claim_number, new_element, new_element)
+                    self.assert_warn(not(new_element in new_elements), message, dav_keyword=new_element, location=claim_location(claim_number), rule_id='element-introduced-twice')
+                    
+                    if not(new_element in new_elements):
+                        new_elements.add(new_element, new_element_iter.start())
+                        
+                        if not(new_element in result.element_introductions):
+                            result.element_introductions[new_element] = (claim_number, new_element_iter.start())
+                        for term_that_should_not_be_in_claim_element in terms_that_should_not_be_in_claim_element:
+                            matches, match_str = re_matches(term_that_should_not_be_in_claim_element, new_element)
+                            self.assert_warn(not(matches), 'Claim element "{}" contains a term that should not appear in claim elements: "{}". Likely a mistake was made in marking the claim elements.'.format(new_element, match_str), location=claim_location(claim_number), rule_id='element-term')
+                        self.assert_warn(len(new_element) < long_claim_element_limit, 'Claim element "{}" is over {} characters. Likely a mistake was made in marking the claim elements.'.format(new_element, long_claim_element_limit), location=claim_location(claim_number), rule_id='element-length')
+                
+                for old_element_iter in old_elements:
+                    old_element = old_element_iter.group()[1:-1]
+                    old_element_index = old_element_iter.start()
+                    
+                    new_element_index = new_elements.position(old_element)
+                    ab_bool = not(new_element_index is None) and (new_element_index < old_element_index)
+                    
+                    if not(ab_bool):
+                        message = 'Claim {} recites "{}", which possibly lacks antecedent basis. See MPEP 2173.05(e).'.format(claim_number, old_element)
+                        
+                        # Say where the element was introduced, if anywhere.
+                        if not(new_element_index is None):
+                            message += ' "{}" is introduced later in claim {}.'.format(old_element, claim_number)
+                        elif old_element in result.element_introductions:
+                            message += ' "{}" is introduced in claim {}, which claim {} does not depend on.'.format(old_element, result.element_introductions[old_element][0], claim_number)
+                        
+                        self.warn(message, dav_keyword=old_element, location=claim_location(claim_number), rule_id='antecedent-basis')
+                    
+                    for term_that_should_not_be_in_claim_element in terms_that_should_not_be_in_claim_element:
+                        matches, match_str = re_matches(term_that_should_not_be_in_claim_element, old_element)
+                        self.assert_warn(not(matches), 'Claim element "{}" contains a term that should not appear in claim elements: "{}". Likely a mistake was made in marking the claim elements.'.format(old_element, match_str), location=claim_location(claim_number), rule_id='element-term')
+                        self.assert_warn(len(old_element) < long_claim_element_limit, 'Claim element "{}" is over {} characters. Likely a mistake was made in marking the claim elements.'.format(old_element, long_claim_element_limit), location=claim_location(claim_number), rule_id='element-length')
+                
+                result.new_elements_in_claims[claim_number] = new_elements
+                
+                # The trie for the claims depending on this claim shares the nodes of the trie of the parent claim.
+                element_tries[claim_number] = element_trie.extended(new_elements.positions)
+                
+                if not(self.profiler is None):
+                    self.profiler.stop()
+            
+            prev_claim_number = claim_number
+        
+        if self.args.debug and self.args.ant_basis:
+            for claim_number in result.claim_numbers:
+                print("New elements in claim {}:".format(claim_number), result.new_elements_in_claims[claim_number])
     
-    for element in spec_appearances_of_element:
-        if spec_appearances_of_element[element] == 0:
-            warn("Claim element that does not appear in the spec: {}. Possible drawing objection if the element is not in the drawings. See MPEP 608.02(d). Possible weak disclosure for the element, leading to 112(a) issues.".format(element), dav_keyword=element)
-        elif spec_appearances_of_element[element] <= 2:
-            warn("Claim element that appears in the spec 1 or 2 times: {}. Possible weak disclosure for the element, leading to 112(a) issues.".format(element), dav_keyword=element)
-
-assert_warn(shortest_indep_claim_number_by_len == lowest_claim_number, "The least restrictive claim (by number of characters) is claim {}. However, claim {} is supposed to be the least restrictive claim. Check that it is. See MPEP 608.01(i).".format(shortest_indep_claim_number_by_len, lowest_claim_number))
-assert(shortest_indep_claim_number_by_len in indep_claims)
-
-if args.ant_basis:
-    shortest_indep_claim_elements = 1e6
-    shortest_indep_claim_number_by_elements = 0
-    for claim_number in claim_numbers:
-        number_of_elements = len(new_elements_in_claims[claim_number])
+    def check_spec_elements(self, spec):
+        result = self.result
+        
+        all_elements = set()
+        for claim_number in result.claim_numbers:
+            for element in result.new_elements_in_claims[claim_number]:
+                #print(claim_number, element)
+                all_elements.add(element)
         
-        if number_of_elements < shortest_indep_claim_elements:
-            shortest_indep_claim_number_by_elements = claim_number
-            shortest_indep_claim_elements = number_of_elements
+        # Count the appearances of all of the elements in one pass over the spec.
+        element_counter = ElementCounter(all_elements, ignore_case=self.args.spec_ignore_case, whole_words=self.args.spec_whole_words)
+        spec_appearances_of_element, spec_offsets_of_element = element_counter.count(spec.text)
+        
+        for element in all_elements:
+            if spec_appearances_of_element[element] == 0:
+                self.warn("Claim element that does not appear in the spec: {}. Possible drawing objection if the element is not in the drawings. See MPEP 608.02(d). Possible weak disclosure for the element, leading to 112(a) issues.".format(element), dav_keyword=element, rule_id='spec-element-missing')
+            elif spec_appearances_of_element[element] <= 2:
+                self.warn("Claim element that appears in the spec 1 or 2 times: {}. Possible weak disclosure for the element, leading to 112(a) issues.".format(element), dav_keyword=element, location=spec_location(spec, spec_offsets_of_element[element][0]), rule_id='spec-element-rare')
+                
+                if self.args.verbose:
+                    for offset in spec_offsets_of_element[element]:
+                        print("Appearance of {} in the spec: ...{}...".format(element, spec.text[max(offset-60, 0):offset+len(element)+60]))
     
-    assert_warn(shortest_indep_claim_number_by_elements == lowest_claim_number, "The least restrictive claim (by number of claim elements) is claim {}. However, claim {} is supposed to be the least restrictive claim. Check that it is. See MPEP 608.01(i).".format(shortest_indep_claim_number_by_elements, lowest_claim_number))
-    assert(shortest_indep_claim_number_by_elements in indep_claims)
-
-dav_search_string = ''
-for dav_keyword in dav_keywords:
-    if ' ' in dav_keyword:
-        dav_search_string += '"'+dav_keyword+'" '
-    else:
-        dav_search_string += dav_keyword+' '
-dav_search_string = dav_search_string.strip()
-
-if args.uspto:
-    if dav_search_string != "":
-        eprint("\nDAV claims viewer search string:", dav_search_string)
-
-if args.restriction:
-    if not args.spec is None:
-        eprint('\nSpecies election analysis (see MPEP 806.04):\n')
+    def check_least_restrictive(self):
+        result = self.result
         
-        # Check for phrases in the spec that could indicate a species election is possible. For now this checks if certain text appears in the "BRIEF DESCRIPTION OF THE DRAWINGS" section or a similarly titled section.
+        self.assert_warn(result.shortest_indep_claim_number_by_len == result.lowest_claim_number, "The least restrictive claim (by number of characters) is claim {}. However, claim {} is supposed to be the least restrictive claim. Check that it is. See MPEP 608.01(i).".format(result.shortest_indep_claim_number_by_len, result.lowest_claim_number), rule_id='least-restrictive-length')
+        assert(result.shortest_indep_claim_number_by_len in result.indep_claims)
         
-        no_possible_species_elections_detected = True
+        if self.args.ant_basis:
+            shortest_indep_claim_elements = 1e6
+            shortest_indep_claim_number_by_elements = 0
+            for claim_number in result.claim_numbers:
+                # A dependent claim has at least the claim elements of its parent claim, unless they weren't imported because the parent claim doesn't precede it.
+                if not(claim_number in result.indep_claims):
+                    continue
+                
+                number_of_elements = len(result.new_elements_in_claims[claim_number])
+            
+                if number_of_elements < shortest_indep_claim_elements:
+                    shortest_indep_claim_number_by_elements = claim_number
+                    shortest_indep_claim_elements = number_of_elements
         
-        with open(args.spec, "r", encoding="utf-8") as spec_file:
-            line = spec_file.readline()
+            self.assert_warn(shortest_indep_claim_number_by_elements == result.lowest_claim_number, "The least restrictive claim (by number of claim elements) is claim {}. However, claim {} is supposed to be the least restrictive claim. Check that it is. See MPEP 608.01(i).".format(shortest_indep_claim_number_by_elements, result.lowest_claim_number), rule_id='least-restrictive-elements')
+            assert(shortest_indep_claim_number_by_elements in result.indep_claims)
+    
+    def check_restriction(self, spec):
+        result = self.result
+        
+        if not spec is None:
+            self.eprint('\nSpecies election analysis (see MPEP 806.04):\n')
             
-            in_drawings_section = False
+            # Check for phrases in the spec that could indicate a species election is possible. For now this checks if certain text appears in the "BRIEF DESCRIPTION OF THE DRAWINGS" section or a similarly titled section.
             
-            while line:
-                line = line.replace('\n', '').strip()
+            no_possible_species_elections_detected = True
+            
+            for heading, lines in spec.sections:
+                if heading is None:
+                    continue
                 
-                if line.isupper():
-                    if args.debug:
-                        print("New section:", line)
-                    
-                    if re.search(r"\b(DRAWINGS|FIGURES)\b", line):
-                        in_drawings_section = True
-                        if args.debug:
-                            print("Drawings section detected.")
-                    else:
-                        in_drawings_section = False
+                if self.args.debug:
+                    print("New section:", heading)
+                
+                if not re.search(r"\b(DRAWINGS|FIGURES)\b", heading):
+                    continue
+                
+                if self.args.debug:
+                    print("Drawings section detected.")
                 
                 # - US20200030830A1: > FIG. 3A shows the same perspective view of the lower valve member without the upstream flow restriction fingers.
                 #   - number followed by letter could indicate an alternative embodiment?
@@ -951,173 +2519,899 @@ if args.restriction:
                 # - Unclear how to handle: US20200246764A1, US20210387211A1, US20200282410A1, US20200068820A1, US20220048367A1
                 # TODO: I recall seeing something like "second exemplary embodiment" before, so perhaps I should have a regex with additional phrases for a middle word.
                 
-                if in_drawings_section:
-                    if args.debug:
+                for line in lines:
+                    if self.args.debug:
                         print("In drawings section:", line)
                     if re.search(r"^(fig\.|figure) \d.*\b(alternative|alternate|another|further|optional)\b^", line, flags=re.IGNORECASE) or re.search(r"^(fig\.|figure) \d.*\b(second|third|fourth|fifth|sixth) embodiment\b", line, flags=re.IGNORECASE):
-                        warn("Possible species election: {}".format(line))
+                        self.warn("Possible species election: {}".format(line), rule_id='species-election')
                         no_possible_species_elections_detected = False
-                
-                # Advance line
-                line = spec_file.readline()
-        
-        if no_possible_species_elections_detected:
-            eprint("No possible species elections detected. These can usually be found by looking at the figures.")
-    
-    if len(indep_claims) > 1:
-        eprint('\n"Catalog of parts" restriction analysis:\n')
-        # I'm calling it the "catalog of parts" restriction analysis as it only looks at identified claim elements and not their functions or how the parts are connected or related. This terminology is used by the following:
-        # <https://www.djstein.com/IP/Files/Landis%20on%20Mechanics%20of%20Patent%20Claim%20Drafting.pdf>
-        # <https://repository.law.uic.edu/ripl/vol13/iss1/2/>
-        # <https://scholarlycommons.law.emory.edu/elj/vol65/iss4/2>
+            
+            if no_possible_species_elections_detected:
+                self.eprint("No possible species elections detected. These can usually be found by looking at the figures.")
         
-        if number_of_dep_claims > 0:
-            # Find all claim elements in claims dependent on each independent claim.
+        if len(result.indep_claims) > 1:
+            self.eprint('\n"Catalog of parts" restriction analysis:\n')
+            # I'm calling it the "catalog of parts" restriction analysis as it only looks at identified claim elements and not their functions or how the parts are connected or related. This terminology is used by the following:
+            # <https://www.djstein.com/IP/Files/Landis%20on%20Mechanics%20of%20Patent%20Claim%20Drafting.pdf>
+            # <https://repository.law.uic.edu/ripl/vol13/iss1/2/>
+            # <https://scholarlycommons.law.emory.edu/elj/vol65/iss4/2>
             
-            claim_group_elements = {}
+            element_index = ElementIndex()
             
-            for indep_claim in indep_claims:
-                claim_elements = set(new_elements_in_claims[indep_claim].keys())
-                
-                claim_group_elements[indep_claim] = copy.deepcopy(claim_elements)
+            claim_bits = {}
+            for indep_claim in result.indep_claims:
+                claim_bits[indep_claim] = element_index.bits(result.new_elements_in_claims[indep_claim])
             
-            for dependent_claim in parent_claims:
-                parent_claim = parent_claims[dependent_claim]
-                while not parent_claim in indep_claims:
-                    parent_claim = parent_claims[parent_claim]
-                
-                indep_claim = parent_claim
+            # Find all claim elements in claims dependent on each independent claim.
+            claim_group_bits = copy.copy(claim_bits)
+            
+            for dependent_claim in result.parent_claims:
+                # The claim graph has the independent claim of each claim. Claims depending on a claim that does not exist have none.
+                indep_claim = result.claim_graph.independent_claims[dependent_claim]
+                if indep_claim is None:
+                    continue
                 
-                if args.debug:
+                if self.args.debug:
                     print("Dependent claim {} depends on independent claim {}".format(dependent_claim, indep_claim))
                 
-                for claim_element in set(new_elements_in_claims[dependent_claim].keys()):
-                    claim_group_elements[indep_claim].add(claim_element)
-        
-        possible_restriction = False
-        for i, claim_combo in enumerate(powerset(sorted(indep_claims)), 1):
-            if len(claim_combo) == 2:
-                claim_list = list(claim_combo)
-                #print("Claim combination being analyzed for restrictions: {}".format(claim_list))
-                
-                claim_X = claim_list[0]
-                claim_Y = claim_list[1]
-                
-                claim_X_elements = set(new_elements_in_claims[claim_X].keys())
-                claim_Y_elements = set(new_elements_in_claims[claim_Y].keys())
-                
-                common_elements = set()
-                claim_X_unique_elements = copy.deepcopy(claim_X_elements)
-                claim_Y_unique_elements = copy.deepcopy(claim_Y_elements)
+                claim_group_bits[indep_claim] |= element_index.bits(result.new_elements_in_claims[dependent_claim])
+            
+            possible_restriction = False
+            for claim_X, claim_Y in combinations(sorted(result.indep_claims), 2):
+                #print("Claim combination being analyzed for restrictions: {}".format([claim_X, claim_Y]))
                 
-                for claim_X_element in claim_X_elements:
-                    if claim_X_element in claim_Y_unique_elements:
-                        claim_Y_unique_elements.remove(claim_X_element)
-                        common_elements.add(claim_X_element)
+                common_bits          = claim_bits[claim_X] & claim_bits[claim_Y]
+                claim_X_unique_bits  = claim_bits[claim_X] & ~claim_bits[claim_Y]
+                claim_Y_unique_bits  = claim_bits[claim_Y] & ~claim_bits[claim_X]
                 
-                for claim_Y_element in claim_Y_elements:
-                    if claim_Y_element in claim_X_unique_elements:
-                        claim_X_unique_elements.remove(claim_Y_element)
+                number_of_common_elements = count_elements(common_bits)
+                number_of_claim_X_unique_elements = count_elements(claim_X_unique_bits)
+                number_of_claim_Y_unique_elements = count_elements(claim_Y_unique_bits)
                 
-                eprint("Category of claim {}: {}".format(claim_X, indep_claim_types[claim_X]))
-                eprint("Category of claim {}: {}".format(claim_Y, indep_claim_types[claim_Y]))
-                eprint("Elements common to claims {} and {} ({} total): {}".format(claim_X, claim_Y, len(common_elements), common_elements))
-                eprint("Elements unique to claim {} ({} total): {}".format(claim_X, len(claim_X_unique_elements), claim_X_unique_elements))
-                eprint("Elements unique to claim {} ({} total): {}".format(claim_Y, len(claim_Y_unique_elements), claim_Y_unique_elements))
+                self.eprint("Category of claim {}: {}".format(claim_X, result.indep_claim_types[claim_X]))
+                self.eprint("Category of claim {}: {}".format(claim_Y, result.indep_claim_types[claim_Y]))
+                self.eprint("Elements common to claims {} and {} ({} total): {}".format(claim_X, claim_Y, number_of_common_elements, element_index.element_set(common_bits)))
+                self.eprint("Elements unique to claim {} ({} total): {}".format(claim_X, number_of_claim_X_unique_elements, element_index.element_set(claim_X_unique_bits)))
+                self.eprint("Elements unique to claim {} ({} total): {}".format(claim_Y, number_of_claim_Y_unique_elements, element_index.element_set(claim_Y_unique_bits)))
                 
-                if number_of_dep_claims > 0:
-                    claim_X_group_elements = copy.deepcopy(claim_group_elements[claim_X])
-                    claim_Y_group_elements = copy.deepcopy(claim_group_elements[claim_Y])
-                    
-                    group_common_elements = set()
-                    claim_X_group_unique_elements = copy.deepcopy(claim_X_group_elements)
-                    claim_Y_group_unique_elements = copy.deepcopy(claim_Y_group_elements)
-                    
-                    for claim_X_group_element in claim_X_group_elements:
-                        if claim_X_group_element in claim_Y_group_unique_elements:
-                            claim_Y_group_unique_elements.remove(claim_X_group_element)
-                            group_common_elements.add(claim_X_group_element)
+                if result.number_of_dep_claims > 0:
+                    group_common_bits         = claim_group_bits[claim_X] & claim_group_bits[claim_Y]
+                    claim_X_group_unique_bits = claim_group_bits[claim_X] & ~claim_group_bits[claim_Y]
+                    claim_Y_group_unique_bits = claim_group_bits[claim_Y] & ~claim_group_bits[claim_X]
                     
-                    for claim_Y_group_element in claim_Y_group_elements:
-                        if claim_Y_group_element in claim_X_group_unique_elements:
-                            claim_X_group_unique_elements.remove(claim_Y_group_element)
-                    
-                    eprint("Elements common to claims {} and {} and their dependents ({} total): {}".format(claim_X, claim_Y, len(group_common_elements), group_common_elements))
-                    eprint("Elements unique to claim {} and its dependents ({} total): {}".format(claim_X, len(claim_X_group_unique_elements), claim_X_group_unique_elements))
-                    eprint("Elements unique to claim {} and its dependents ({} total): {}".format(claim_Y, len(claim_Y_group_unique_elements), claim_Y_group_unique_elements))
+                    self.eprint("Elements common to claims {} and {} and their dependents ({} total): {}".format(claim_X, claim_Y, count_elements(group_common_bits), element_index.element_set(group_common_bits)))
+                    self.eprint("Elements unique to claim {} and its dependents ({} total): {}".format(claim_X, count_elements(claim_X_group_unique_bits), element_index.element_set(claim_X_group_unique_bits)))
+                    self.eprint("Elements unique to claim {} and its dependents ({} total): {}".format(claim_Y, count_elements(claim_Y_group_unique_bits), element_index.element_set(claim_Y_group_unique_bits)))
                 
-                if len(common_elements) == 0:
-                    warn("Possible restriction. Claims {} and {} may be unrelated/independent. See MPEP 806.06. Check for dependent linking claims.".format(claim_X, claim_Y))
+                if number_of_common_elements == 0:
+                    self.warn("Possible restriction. Claims {} and {} may be unrelated/independent. See MPEP 806.06. Check for dependent linking claims.".format(claim_X, claim_Y), rule_id='restriction-unrelated')
                     possible_restriction = True
                 
                 # Situations considered here:
                 # 
                 # ABbr = claim X
                 # Bsp = claim Y
-                # A = claim_X_unique_elements
-                # Bbr = common_elements
-                # Bsp - Bbr = claim_Y_unique_elements
+                # A = claim_X_unique_bits
+                # Bbr = common_bits
+                # Bsp - Bbr = claim_Y_unique_bits
                 # 
                 # or
                 # 
                 # ABbr = claim Y
                 # Bsp = claim X
-                # A = claim_Y_unique_elements
-                # Bbr = common_elements
-                # Bsp - Bbr = claim_X_unique_elements
+                # A = claim_Y_unique_bits
+                # Bbr = common_bits
+                # Bsp - Bbr = claim_X_unique_bits
                 # 
                 # All that needs to be shown is that there are common elements (Bbr), and there are extra elements corresponding to A and Bsp - Br in claims X and Y. Which claims correspond to A and Bsp does not matter.
-                if (len(claim_X_unique_elements) > 0) and (len(claim_Y_unique_elements) > 0) and (len(common_elements) > 0) and (indep_claim_types[claim_X] == indep_claim_types[claim_Y]):
-                    warn("Possible restriction. {} claims {} and {} may be related as combination-subcombination. See MPEP 806.05(c). Check for dependent linking claims.".format(indep_claim_types[claim_X].capitalize(), claim_X, claim_Y))
+                if (number_of_claim_X_unique_elements > 0) and (number_of_claim_Y_unique_elements > 0) and (number_of_common_elements > 0) and (result.indep_claim_types[claim_X] == result.indep_claim_types[claim_Y]):
+                    self.warn("Possible restriction. {} claims {} and {} may be related as combination-subcombination. See MPEP 806.05(c). Check for dependent linking claims.".format(result.indep_claim_types[claim_X].capitalize(), claim_X, claim_Y), rule_id='restriction-combination-subcombination')
                     possible_restriction = True
                 
-                # Though the `(len(claim_X_unique_elements) > 0) or (len(claim_Y_unique_elements) > 0)` part is not necessarily required, without it, this is likely to return many false positives. Process claims which merely repeat the product claim are not likely to be restrictable, so the extra condition in the first sentence is practically necessary
-                if (((indep_claim_types[claim_X] == 'method') and (indep_claim_types[claim_Y] == 'apparatus')) or ((indep_claim_types[claim_X] == 'apparatus') and (indep_claim_types[claim_Y] == 'method'))) and (len(common_elements) > 0) and ((len(claim_X_unique_elements) > 0) or (len(claim_Y_unique_elements) > 0)):
-                    warn("Possible restriction. {} claim {} and {} claim {} may be related as a distinct product and process pair. See MPEP 806.05(e)-806.05(i). Check for dependent linking claims.".format(indep_claim_types[claim_X].capitalize(), indep_claim_types[claim_Y], claim_X, claim_Y))
+                # Though the `(number_of_claim_X_unique_elements > 0) or (number_of_claim_Y_unique_elements > 0)` part is not necessarily required, without it, this is likely to return many false positives. Process claims which merely repeat the product claim are not likely to be restrictable, so the extra condition in the first sentence is practically necessary
+                if (((result.indep_claim_types[claim_X] == 'method') and (result.indep_claim_types[claim_Y] == 'apparatus')) or ((result.indep_claim_types[claim_X] == 'apparatus') and (result.indep_claim_types[claim_Y] == 'method'))) and (number_of_common_elements > 0) and ((number_of_claim_X_unique_elements > 0) or (number_of_claim_Y_unique_elements > 0)):
+                    self.warn("Possible restriction. {} claim {} and {} claim {} may be related as a distinct product and process pair. See MPEP 806.05(e)-806.05(i). Check for dependent linking claims.".format(result.indep_claim_types[claim_X].capitalize(), result.indep_claim_types[claim_Y], claim_X, claim_Y), rule_id='restriction-product-process')
                     possible_restriction = True
                 
-                eprint()
+                self.eprint()
+            
+            # Check for claim elements unique to an independent claim when compared against all other independent claims and their dependencies.
+            # MAYBE later: Make plint check for claim elements unique to a claim *and its dependencies* when compared against all other independent claims and their dependencies. This just checks each independent claim.
+            for indep_claim in sorted(result.indep_claims):
+                other_claim_group_bits = 0
+                for other_indep_claim in result.indep_claims:
+                    if other_indep_claim != indep_claim:
+                        other_claim_group_bits |= claim_group_bits[other_indep_claim]
+                
+                unique_indep_claim_bits = claim_bits[indep_claim] & ~other_claim_group_bits
+                
+                self.eprint("Elements unique to claim {} alone compared against all other independent claims and their dependents ({} total): {}".format(indep_claim, count_elements(unique_indep_claim_bits), element_index.element_set(unique_indep_claim_bits)))
+            
+            if not(possible_restriction):
+                self.warn("No restriction appears possible on the basis of claim elements alone. Relationships between the elements or functions of the elements might allow a restriction. A species election may be possible as well.\n", rule_id='restriction-none')
+        else:
+            self.warn("\nRestriction analysis: Only one independent claim. A species election may be possible.", rule_id='restriction-one-independent-claim')
+    
+    def check_attribute_time(self):
+        result = self.result
+        
+        if (result.number_of_indep_claims >= 4) and (result.number_of_dep_claims >= 25):
+            self.warn("Application has 4 or more independent claims and 25 or more total claims, and consequently is eligible for 1 hour of attribute time. See Examiner PAP, Oct. 2021.", rule_id='attribute-time')
+        elif result.number_of_indep_claims >= 4:
+            self.warn("Application has 4 or more independent claims and consequently is eligible for 1 hour of attribute time. See Examiner PAP, Oct. 2021.", rule_id='attribute-time')
+        elif result.number_of_dep_claims >= 25:
+            self.warn("Application has 25 or more total claims and consequently is eligible for 1 hour of attribute time. See Examiner PAP, Oct. 2021.", rule_id='attribute-time')
+
+def sarif_region(text, line_starts, start, end):
+    # A SARIF region from the index start to the index end in text. Lines and columns start from 1, and columns count characters (see the columnKind of the run).
+    start_line = bisect.bisect_right(line_starts, start) - 1
+    end_line = bisect.bisect_right(line_starts, max(end-1, start)) - 1
+    return {'startLine': start_line+1, 'startColumn': start-line_starts[start_line]+1, 'endLine': end_line+1, 'endColumn': end-line_starts[end_line]+1}
+
+def sarif_log(result, claims_file, spec_file, claims_text=None):
+    # The warnings of a lint in the SARIF 2.1.0 format: <https://docs.oasis-open.org/sarif/sarif/v2.1.0/sarif-v2.1.0.html>
+    # With the claims text, warnings about claims have the region of the claims file that they are about.
+    if claims_text is None:
+        offsets_by_claim = {}
+    else:
+        offsets_by_claim = claim_offsets(claims_text)
+        claims_line_starts = line_starts_of(claims_text)
+    
+    rule_ids = []
+    sarif_results = []
+    for warning in result.warnings:
+        sarif_result = {'level': 'warning', 'message': {'text': warning['message'].strip()}}
+        properties = {'davKeyword': warning['dav_keyword'], 'mpep': warning['mpep']}
         
-        # Check for claim elements unique to an independent claim when compared against all other independent claims and their dependencies.
-        # MAYBE later: Make plint check for claim elements unique to a claim *and its dependencies* when compared against all other independent claims and their dependencies. This just checks each independent claim.
-        for indep_claim in sorted(indep_claims):
-            unique_indep_claim_elements = copy.deepcopy(set(new_elements_in_claims[indep_claim].keys()))
+        if not(warning['rule_id'] is None):
+            sarif_result['ruleId'] = warning['rule_id']
             
-            for other_indep_claim in indep_claims:
-                if other_indep_claim == indep_claim:
-                    continue
+            if not(warning['rule_id'] in rule_ids):
+                rule_ids.append(warning['rule_id'])
+        
+        location = warning['location']
+        if location is None:
+            pass
+        elif location['file'] == 'claims':
+            physical_location = {'artifactLocation': {'uri': claims_file}}
+            span = claim_span(offsets_by_claim, location)
+            if not(span is None):
+                physical_location['region'] = sarif_region(claims_text, claims_line_starts, span[0], span[1])
+            
+            sarif_result['locations'] = [{'physicalLocation': physical_location, 'logicalLocations': [{'name': 'claim {}'.format(location['claim'])}]}]
+            properties['claim'] = location['claim']
+            properties['start'] = location['start']
+            properties['end'] = location['end']
+        elif location['file'] == 'spec':
+            sarif_result['locations'] = [{'physicalLocation': {'artifactLocation': {'uri': spec_file}, 'region': {'startLine': location['line'], 'startColumn': location['column']}}}]
+        
+        sarif_result['properties'] = properties
+        sarif_results.append(sarif_result)
+    
+    return {'$schema': 'https://json.schemastore.org/sarif-2.1.0.json', 'version': '2.1.0', 'runs': [{'tool': {'driver': {'name': 'plint', 'version': plint_version, 'rules': [{'id': rule_id} for rule_id in rule_ids]}}, 'columnKind': 'unicodeCodePoints', 'results': sarif_results}]}
+
+def print_summary(result):
+    print()
+    print("Summary statistics:")
+    print("# of claims: {}".format(result.number_of_claims))
+    print("Indep. claims: {}".format(result.number_of_indep_claims), result.indep_claim_types)
+    print("Depen. claims: {}".format(result.number_of_dep_claims))
+    print("Warnings: {}".format(result.number_of_warnings()))
+
+def find_batch_files(batch):
+    # Find the JSON input files and claims files in a directory or matching a glob.
+    if os.path.isdir(batch):
+        file_names = glob.glob(os.path.join(batch, '*.json')) + glob.glob(os.path.join(batch, '*.txt'))
+    else:
+        file_names = glob.glob(batch)
+    
+    json_files = []
+    text_files = []
+    for file_name in sorted(file_names):
+        if file_name.endswith('.json'):
+            json_files.append(file_name)
+        elif os.path.isfile(file_name):
+            text_files.append(file_name)
+    
+    # Files used by a JSON input file are linted through that JSON input file.
+    # A JSON input file that can't be read is still linted, so that it gets the error and exit status 1 like any other file that can't be linted.
+    used_files = set()
+    for json_file in json_files:
+        try:
+            with open(json_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        
+        if not(isinstance(data, dict)):
+            continue
+        
+        for key in ['claims', 'spec']:
+            if (key in data) and isinstance(data[key], str):
+                used_files.add(os.path.realpath(os.path.join(os.path.dirname(json_file), data[key])))
+    
+    batch_files = copy.copy(json_files)
+    for text_file in text_files:
+        if os.path.realpath(text_file) in used_files:
+            continue
+        
+        # Skip text files that do not start with a claim, for example, specifications. A text file that can't be read is linted to get the error.
+        try:
+            with open(text_file) as f:
+                first_line = f.readline()
+                while first_line != '' and first_line.strip() == '':
+                    first_line = f.readline()
+        except (OSError, ValueError):
+            batch_files.append(text_file)
+            continue
+        
+        if re.match(r"\s*\d+\.", first_line):
+            batch_files.append(text_file)
+    
+    return sorted(batch_files)
+
+def batch_file_args(args, batch_file):
+    # Command line arguments for one file in batch mode. The command line flags apply to every file.
+    file_args = copy.copy(args)
+    file_args.batch = None
+    file_args.filter = copy.copy(args.filter)
+    file_args.claims = batch_file
+    file_args.outfile = True
+    
+    # The files are already linted in parallel, and worker processes can't start their own worker processes.
+    file_args.jobs = None
+    
+    if batch_file.endswith('.json'):
+        data = read_json_file(file_args)
+        
+        # Files named in a JSON input file are relative to the JSON input file in batch mode.
+        for key in ['claims', 'spec', 'claims_warnings']:
+            if (key in data) and (getattr(file_args, key) == data[key]) and not(os.path.isabs(data[key])):
+                setattr(file_args, key, os.path.join(os.path.dirname(batch_file), data[key]))
+    
+    if file_args.claims_warnings is None:
+        file_args.claims_warnings = default_warnings_file('claims')
+    
+    return file_args
+
+def claims_then_error(claims, error):
+    # Yields the claims and then raises the error, if any.
+    for claim in claims:
+        yield claim
+    
+    if not(error is None):
+        raise error
+
+def precompute_family(family_and_args):
+    # Works out the slow steps of one independent claim family in a worker process. See Linter.precompute_claims_in_parallel().
+    family, args = family_and_args
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Linter(args).precompute_claims(family)
+
+def lint_batch_file(batch_file_and_args):
+    # Lint one file in a worker process. Returns the file name, the exit status, the result (None in case of an error), an error message, and the output that would have gone to stdout.
+    batch_file, args = batch_file_and_args
+    
+    stdout = io.StringIO()
+    result = None
+    error_message = None
+    try:
+        with contextlib.redirect_stdout(stdout):
+            file_args = batch_file_args(args, batch_file)
+            
+            error_message = check_input_files(file_args)
+            
+            if error_message is None:
+                linter = Linter(file_args)
+                
+                with open(file_args.claims) as claim_file:
+                    claims_text = claim_file.read()
                 
-                unique_indep_claim_elements_copy = copy.deepcopy(unique_indep_claim_elements)
+                if file_args.spec is None:
+                    spec = None
+                else:
+                    with open(file_args.spec, "r", encoding="utf-8") as spec_file:
+                        spec = spec_file.read()
                 
-                for indep_claim_element in unique_indep_claim_elements_copy:
-                    if indep_claim_element in claim_group_elements[other_indep_claim]:
-                        unique_indep_claim_elements.remove(indep_claim_element)
+                result = linter.lint(claims_text, spec=spec, title=file_args.title, claims_file=file_args.claims)
+    except (Exception, SystemExit) as e:
+        error_message = "{}: {}".format(type(e).__name__, str(e).split('\n')[0])
+    
+    if result is None:
+        exit_status = 1
+    else:
+        exit_status = result.exit_status()
+    
+    return batch_file, exit_status, result, error_message, stdout.getvalue()
+
+def run_batch(args):
+    batch_files = find_batch_files(args.batch)
+    
+    if len(batch_files) == 0:
+        eprint("No claims files found for batch:", args.batch)
+        return 1
+    
+    if args.claims_warnings is None:
+        args.claims_warnings = default_warnings_file('claims')
+    
+    # Load the warnings files before starting the worker processes so that each worker process starts with the compiled rules.
+    get_warnings_file(args.claims_warnings, force=args.force, debug=args.debug, cache=not(args.no_cache))
+    if not args.title is None:
+        get_warnings_file(default_warnings_file('title'), force=args.force, debug=args.debug, cache=not(args.no_cache))
+    
+    print("Linting {} files...\n".format(len(batch_files)))
+    
+    number_of_files_by_exit_status = {0: 0, 1: 0, 2: 0}
+    number_of_claims = 0
+    number_of_warnings = 0
+    
+    # With --profile, the profiles of all of the files are added up.
+    profiler = Profiler()
+    
+    with multiprocessing.Pool(processes=args.jobs) as pool:
+        for batch_file, exit_status, result, error_message, stdout in pool.imap(lint_batch_file, [(batch_file, args) for batch_file in batch_files]):
+            if args.verbose:
+                print(stdout, end='')
+            
+            number_of_files_by_exit_status[exit_status] += 1
             
-            eprint("Elements unique to claim {} alone compared against all other independent claims and their dependents ({} total): {}".format(indep_claim, len(unique_indep_claim_elements), unique_indep_claim_elements))
+            if result is None:
+                print("{}: exit status {}. {}".format(batch_file, exit_status, error_message))
+            else:
+                print("{}: exit status {}. {} claims ({} independent), {} warnings.".format(batch_file, exit_status, result.number_of_claims, result.number_of_indep_claims, result.number_of_warnings()))
+                number_of_claims += result.number_of_claims
+                number_of_warnings += result.number_of_warnings()
+                
+                if not(result.profile is None):
+                    profiler.merge(result.profile)
+    
+    print()
+    print("Batch summary statistics:")
+    print("# of files: {}".format(len(batch_files)))
+    print("Files without warnings: {}".format(number_of_files_by_exit_status[0]))
+    print("Files with warnings: {}".format(number_of_files_by_exit_status[2]))
+    print("Files with errors: {}".format(number_of_files_by_exit_status[1]))
+    print("# of claims: {}".format(number_of_claims))
+    print("Warnings: {}".format(number_of_warnings))
+    
+    if not(args.profile is None):
+        if args.profile == '':
+            args.profile = 'plint-profile.json'
         
-        if not(possible_restriction):
-            warn("No restriction appears possible on the basis of claim elements alone. Relationships between the elements or functions of the elements might allow a restriction. A species election may be possible as well.\n")
+        profiler.print_report(args.profile)
+    
+    if number_of_files_by_exit_status[1] > 0:
+        return 1
+    elif number_of_files_by_exit_status[2] > 0:
+        return 2
+    else:
+        return 0
+
+def file_mtime(file_name):
+    # Returns None if the file does not exist, for example while an editor is replacing it.
+    try:
+        return os.stat(file_name).st_mtime_ns
+    except OSError:
+        return None
+
+def run_watch(command_line_args, interval=0.5):
+    # Lint whenever the claims file, the spec, or the JSON input file changes, checking for changes every interval seconds.
+    # The warnings files, the claim cache, and the spec are kept loaded between runs. The spec is only read again if it changed, and only the claims that changed are checked again (see ClaimCache).
+    if command_line_args.claims.endswith('.json'):
+        json_file = command_line_args.claims
     else:
-        warn("\nRestriction analysis: Only one independent claim. A species election may be possible.")
+        json_file = None
+    
+    args = command_line_args
+    linter = None
+    spec = None
+    mtimes = None
+    
+    try:
+        while True:
+            watched_files = [json_file, args.claims, args.spec]
+            new_mtimes = dict((file_name, file_mtime(file_name)) for file_name in watched_files if not(file_name is None))
+            
+            if new_mtimes == mtimes:
+                time.sleep(interval)
+                continue
+            
+            changed_files = set(file_name for file_name in new_mtimes if (mtimes is None) or (new_mtimes[file_name] != mtimes.get(file_name)))
+            mtimes = new_mtimes
+            
+            # Errors, for example from a file saved halfway or a claim marked incorrectly, are printed, and the next change is linted as usual. Any error is caught so that a file being edited can't stop the watcher.
+            try:
+                # A change to the JSON input file can change any option, so everything is set up again.
+                if (linter is None) or (json_file in changed_files):
+                    args = copy.copy(command_line_args)
+                    if not(json_file is None):
+                        read_json_file(args)
+                    
+                    if args.claims_warnings is None:
+                        args.claims_warnings = default_warnings_file('claims')
+                    
+                    spec = None
+                    mtimes = dict((file_name, file_mtime(file_name)) for file_name in [json_file, args.claims, args.spec] if not(file_name is None))
+                    
+                    error_message = check_input_files(args)
+                    if not(error_message is None):
+                        linter = None
+                        eprint(error_message)
+                        continue
+                    
+                    linter = Linter(args)
+                
+                if not(args.spec is None) and ((spec is None) or (args.spec in changed_files)):
+                    spec = None
+                    with open(args.spec, "r", encoding="utf-8") as spec_file:
+                        spec = SpecDocument(spec_file.read())
+                
+                with open(args.claims) as claim_file:
+                    claims_text = claim_file.read()
+                
+                print("Linting {}...".format(args.claims))
+                
+                result = linter.lint(claims_text, spec=spec, title=args.title, claims_file=args.claims)
+                
+                print_summary(result)
+            except Exception as e:
+                eprint("{}: {}".format(type(e).__name__, e))
+            
+            print("\nWatching for changes. Press Ctrl+C to stop.\n")
+    except KeyboardInterrupt:
+        return 0
+
+def read_message(stream):
+    # Reads a JSON-RPC message with a Content-Length header, as used by the Language Server Protocol: <https://microsoft.github.io/language-server-protocol/specifications/lsp/3.17/specification/>
+    # Returns None at the end of the stream.
+    content_length = None
+    while True:
+        header = stream.readline()
+        if header == b'':
+            return None
+        
+        header = header.decode('ascii').strip()
+        if header == '':
+            if content_length is None:
+                continue
+            
+            break
+        
+        name, value = header.split(':', 1)
+        if name.strip().lower() == 'content-length':
+            content_length = int(value.strip())
+    
+    return json.loads(stream.read(content_length).decode('utf-8'))
+
+def write_message(stream, message):
+    body = json.dumps(message).encode('utf-8')
+    stream.write('Content-Length: {}\r\n\r\n'.format(len(body)).encode('ascii'))
+    stream.write(body)
+    stream.flush()
+
+def text_position(text, line_starts, offset):
+    # The Language Server Protocol position of the index offset in text. Characters are counted in UTF-16 code units.
+    line = bisect.bisect_right(line_starts, offset) - 1
+    return {'line': line, 'character': len(text[line_starts[line]:offset].encode('utf-16-le'))//2}
+
+def line_starts_of(text):
+    line_starts = [0]
+    for line in io.StringIO(text):
+        line_starts.append(line_starts[-1]+len(line))
+    
+    return line_starts
 
-if args.uspto:
-    if (number_of_indep_claims >= 4) and (number_of_dep_claims >= 25):
-        warn("Application has 4 or more independent claims and 25 or more total claims, and consequently is eligible for 1 hour of attribute time. See Examiner PAP, Oct. 2021.")
-    elif number_of_indep_claims >= 4:
-        warn("Application has 4 or more independent claims and consequently is eligible for 1 hour of attribute time. See Examiner PAP, Oct. 2021.")
-    elif number_of_dep_claims >= 25:
-        warn("Application has 25 or more total claims and consequently is eligible for 1 hour of attribute time. See Examiner PAP, Oct. 2021.")
+def uri_path(uri):
+    return urllib.parse.unquote(urllib.parse.urlparse(uri).path)
 
-print()
-print("Summary statistics:")
-print("# of claims: {}".format(number_of_claims))
-print("Indep. claims: {}".format(number_of_indep_claims), indep_claim_types)
-print("Depen. claims: {}".format(number_of_dep_claims))
-print("Warnings: {}".format(number_of_warnings))
+class LintServer:
+    # A language server that lints the documents open in an editor and publishes the warnings as diagnostics.
+    # A document is a spec if its language ID is "plint-spec" or its file name contains "spec". Every other document except JSON files is a claims document, which is linted with the open spec in the same directory, if any.
+    # Each claims document has its own Linter, so the warnings files and the claim cache stay loaded between changes.
+    # The request "plint/lint" with the parameters "claims", "spec", and "title" lints the text given and returns the diagnostics for the claims and the spec.
+    
+    def __init__(self, args, output_stream):
+        self.args = args
+        self.output_stream = output_stream
+        self.documents = {}
+        self.language_ids = {}
+        self.linters = {}
+        
+        # SpecDocument of each open spec, with the text it was made from.
+        self.spec_documents = {}
+        self.shutdown = False
+    
+    def send(self, message):
+        message['jsonrpc'] = '2.0'
+        write_message(self.output_stream, message)
+    
+    def is_spec(self, uri):
+        return (self.language_ids.get(uri) == 'plint-spec') or ('spec' in os.path.basename(uri_path(uri)).lower())
+    
+    def spec_uri_for(self, claims_uri):
+        directory = os.path.dirname(uri_path(claims_uri))
+        for uri in sorted(self.documents):
+            if self.is_spec(uri) and (os.path.dirname(uri_path(uri)) == directory):
+                return uri
+        
+        return None
+    
+    def spec_document(self, spec_uri):
+        text = self.documents[spec_uri]
+        if not(spec_uri in self.spec_documents) or (self.spec_documents[spec_uri][0] != text):
+            self.spec_documents[spec_uri] = (text, SpecDocument(text))
+        
+        return self.spec_documents[spec_uri][1]
+    
+    def lint(self, key, claims_text, spec_text=None, spec=None, title=None):
+        # Returns the diagnostics for the claims and for the spec.
+        if not(key in self.linters):
+            self.linters[key] = Linter(self.args)
+        
+        if (spec is None) and not(spec_text is None):
+            spec = SpecDocument(spec_text)
+        
+        try:
+            result = self.linters[key].lint(claims_text, spec=spec, title=title, output=OutputSink())
+        except Exception as e:
+            # Fatal errors like incorrect marking are shown at the start of the claims.
+            message = "{}: {}".format(type(e).__name__, e)
+            return [{'range': {'start': {'line': 0, 'character': 0}, 'end': {'line': 0, 'character': 0}}, 'severity': 1, 'source': 'plint', 'message': message}], []
+        
+        offsets_by_claim = claim_offsets(claims_text)
+        claims_line_starts = line_starts_of(claims_text)
+        if spec_text is None:
+            spec_line_starts = None
+        else:
+            spec_line_starts = line_starts_of(spec_text)
+        
+        claims_diagnostics = []
+        spec_diagnostics = []
+        for warning in result.warnings:
+            diagnostic = {'severity': 2, 'source': 'plint', 'message': warning['message'].strip()}
+            if not(warning['rule_id'] is None):
+                diagnostic['code'] = warning['rule_id']
+            
+            location = warning['location']
+            if not(location is None) and (location['file'] == 'spec'):
+                if spec_line_starts is None:
+                    continue
+                
+                offset = spec_line_starts[location['line']-1] + location['column'] - 1
+                
+                # Warnings about a claim element cover the element if it is on one line, otherwise only its start.
+                end_offset = offset
+                dav_keyword = warning['dav_keyword']
+                if not(dav_keyword is None) and (spec_text[offset:offset+len(dav_keyword)] == dav_keyword):
+                    end_offset = offset + len(dav_keyword)
+                
+                diagnostic['range'] = {'start': text_position(spec_text, spec_line_starts, offset), 'end': text_position(spec_text, spec_line_starts, end_offset)}
+                spec_diagnostics.append(diagnostic)
+                continue
+            
+            span = claim_span(offsets_by_claim, location)
+            if span is None:
+                start = 0
+                end = 0
+            else:
+                start, end = span
+            
+            diagnostic['range'] = {'start': text_position(claims_text, claims_line_starts, start), 'end': text_position(claims_text, claims_line_starts, end)}
+            claims_diagnostics.append(diagnostic)
+        
+        return claims_diagnostics, spec_diagnostics
+    
+    def publish(self, uri, diagnostics):
+        self.send({'method': 'textDocument/publishDiagnostics', 'params': {'uri': uri, 'diagnostics': diagnostics}})
+    
+    def lint_document(self, uri):
+        spec_uri = self.spec_uri_for(uri)
+        if spec_uri is None:
+            claims_diagnostics, spec_diagnostics = self.lint(uri, self.documents[uri], title=self.args.title)
+        else:
+            claims_diagnostics, spec_diagnostics = self.lint(uri, self.documents[uri], spec_text=self.documents[spec_uri], spec=self.spec_document(spec_uri), title=self.args.title)
+            self.publish(spec_uri, spec_diagnostics)
+        
+        self.publish(uri, claims_diagnostics)
+    
+    def document_changed(self, uri):
+        if uri.endswith('.json'):
+            return
+        
+        if self.is_spec(uri):
+            # Lint the claims using this spec again.
+            for claims_uri in sorted(self.documents):
+                if not(self.is_spec(claims_uri)) and not(claims_uri.endswith('.json')) and (self.spec_uri_for(claims_uri) == uri):
+                    self.lint_document(claims_uri)
+        else:
+            self.lint_document(uri)
+    
+    def handle(self, message):
+        # Returns the exit status when the server should stop, otherwise None.
+        method = message.get('method')
+        params = message.get('params', {})
+        
+        if method == 'initialize':
+            self.send({'id': message['id'], 'result': {'capabilities': {'textDocumentSync': 1}, 'serverInfo': {'name': 'plint', 'version': plint_version}}})
+        elif method == 'shutdown':
+            self.shutdown = True
+            self.send({'id': message['id'], 'result': None})
+        elif method == 'exit':
+            if self.shutdown:
+                return 0
+            else:
+                return 1
+        elif method == 'textDocument/didOpen':
+            uri = params['textDocument']['uri']
+            self.documents[uri] = params['textDocument']['text']
+            self.language_ids[uri] = params['textDocument'].get('languageId')
+            self.document_changed(uri)
+        elif method == 'textDocument/didChange':
+            # Only full document changes are supported, as set in the response to "initialize".
+            uri = params['textDocument']['uri']
+            self.documents[uri] = params['contentChanges'][-1]['text']
+            self.document_changed(uri)
+        elif method == 'textDocument/didClose':
+            uri = params['textDocument']['uri']
+            self.documents.pop(uri, None)
+            self.language_ids.pop(uri, None)
+            self.linters.pop(uri, None)
+            self.spec_documents.pop(uri, None)
+            self.publish(uri, [])
+        elif method == 'plint/lint':
+            claims_diagnostics, spec_diagnostics = self.lint(method, params['claims'], spec_text=params.get('spec'), title=params.get('title'))
+            self.send({'id': message['id'], 'result': {'claims': claims_diagnostics, 'spec': spec_diagnostics}})
+        elif 'id' in message:
+            # Requests that are not supported get an error. Notifications that are not supported are ignored.
+            self.send({'id': message['id'], 'error': {'code': -32601, 'message': 'Method not found: {}'.format(method)}})
+        
+        return None
+    
+    def run(self, input_stream):
+        while True:
+            message = read_message(input_stream)
+            if message is None:
+                return 1
+            
+            # An error handling one message, for example a message missing a parameter, is logged to stderr and doesn't stop the server. A request still gets a response.
+            try:
+                exit_status = self.handle(message)
+            except Exception as e:
+                eprint("Error handling {}: {}: {}".format(message.get('method'), type(e).__name__, e))
+                if 'id' in message:
+                    self.send({'id': message['id'], 'error': {'code': -32603, 'message': "{}: {}".format(type(e).__name__, e)}})
+                continue
+            
+            if not(exit_status is None):
+                return exit_status
 
-assert(number_of_indep_claims == len(indep_claims))
+def run_server(args):
+    # Anything printed, like the number of warnings loaded, goes to stderr so that stdout only has the messages of the protocol.
+    output_stream = sys.stdout.buffer
+    with contextlib.redirect_stdout(sys.stderr):
+        return LintServer(args, output_stream).run(sys.stdin.buffer)
 
-assert number_of_claims == (number_of_indep_claims + number_of_dep_claims)
+def main():
+    args = parser.parse_args()
+    
+    if args.legal:
+        print("Copyright 2022 Ben Trettel. plint is licensed under the GNU Affero General Public License v3.0, a copy of which has been provided with the software. The license is also available online: https://www.gnu.org/licenses/agpl-3.0.en.html\n")
+        print("This work was developed by Ben Trettel in his personal capacity. The views expressed are his own and do not necessarily reflect the views or policies of the United States Patent and Trademark Office, the Department of Commerce, or the United States government.\n")
+        print("This work comes with absolutely no warranty.")
+        exit()
+    
+    if args.test:
+        match_bool, match_str = re_matches('\\btest\\b', 'This is a test.')
+        assert match_bool
+        match_bool, match_str = re_matches('\\btest\\b', 'A different sentence.')
+        assert not(match_bool)
+        
+        assert remove_punctuation('an element; another element') == 'an element another element'
+        
+        assert Claim("3. The \u0130\u0130 widget of claims 1 or 2, wherein the widget is blue.").parents == [1, 2]
+        
+        assert positive_int('2') == 2
+        for value in ['0', '-1', 'x']:
+            try:
+                positive_int(value)
+                assert False
+            except argparse.ArgumentTypeError:
+                pass
+        
+        rule_engine = RuleEngine([{'regex': '\\btest\\b', 'message': 'Test message. # comment'}, {'regex': '\\bsentence\\b', 'message': 'DEPONLY message.'}])
+        assert rule_engine.matches('This is a TEST sentence.') == [('TEST', 'Test message.'), ('sentence', 'DEPONLY message.')]
+        assert rule_engine.matches('This is a test sentence.', dependent=False) == [('test', 'Test message.')]
+        assert rule_engine.matches('A different claim.') == []
+        assert rule_engine.suppressed_rules(compile_filters(["^Test", "deponly", "(?i)message"]), claim_warning_format) == {0, 1}
+        assert rule_engine.suppressed_rules(compile_filters(["^Test", "sentence"]), claim_warning_format) == set()
+        assert rule_engine.matches('This is a TEST sentence.', skip={0}) == [('sentence', 'DEPONLY message.')]
+        
+        assert rule_words(r"\b(only|also|just)\b") == {'only', 'also', 'just'}
+        assert rule_words(r"\bsufficient(ly)?\b") == {'sufficient', 'sufficiently'}
+        assert rule_words(r"\bclose\sto\b") == {'close'}
+        assert rule_words(r"\b\w*/\w*\b") is None
+        assert rule_words(r"test") is None
+        rule_engine = RuleEngine([{'regex': '\\bkey\\b', 'message': 'Key message.'}, {'regex': 'ey', 'message': 'Unindexed message.'}])
+        assert rule_engine.unindexed_rules == [1]
+        assert rule_engine.matches('A \u212aEY.') == [('\u212aEY', 'Key message.'), ('EY', 'Unindexed message.')]
+        assert rule_engine.matches('A monkey.') == [('ey', 'Unindexed message.')]
+        
+        assert rule_backtracking(r"(a+)+b") == "nested repeats"
+        assert rule_backtracking(r"(.|\s)*x") == "repeated alternatives matching the same character"
+        assert rule_backtracking(r"(\w+\s)*x") is None
+        rule_engine = RuleEngine([{'regex': '(a+)+b', 'message': 'Nested message.'}, {'regex': '(x+x+)+y', 'message': 'Slow message.'}, {'regex': 'x', 'message': 'X message.'}])
+        assert list(rule_engine.skipped_rules) == [0]
+        if RuleTimer(0.1).enabled:
+            timed_out_rules = {}
+            assert rule_engine.search('x'*40, time_limit=0.1, timed_out_rules=timed_out_rules)[0][2] == 'X message.'
+            assert list(timed_out_rules) == ['warnings:2']
+            assert list(rule_engine.skipped_rules) == [0]
+            
+            # A rule that takes too long is only skipped for the rest of the lint, and the claims checked without it aren't cached.
+            linter = Linter(args)
+            linter.warnings = rule_engine
+            linter.suppressed_warnings = set()
+            linter.claim_rule_time_limit = 0.1
+            for lint_number in range(2):
+                output = OutputSink()
+                result = linter.lint("1. A widget of " + 'x'*40 + ".\n", output=output)
+                assert [warning['rule_id'] for warning in result.warnings if str(warning['rule_id']).startswith('warnings:')] == ['warnings:3']
+                assert output.getvalue().count('Skipping rule warnings:1, which could take exponential time') == 1
+                assert output.getvalue().count('Skipping rule warnings:2 for the rest of this lint') == 1
+        
+        element_index = ElementIndex()
+        claim_X_bits = element_index.bits(['enclosure', 'display', 'button'])
+        claim_Y_bits = element_index.bits(['enclosure', 'widget'])
+        assert element_index.element_set(claim_X_bits & claim_Y_bits) == {'enclosure'}
+        assert element_index.element_set(claim_X_bits & ~claim_Y_bits) == {'display', 'button'}
+        assert count_elements(claim_X_bits | claim_Y_bits) == 4
+        
+        claim_text = "A contraption} comprising: an enclosure, a display, at least one button, and at least one widget} mounted on the enclosure, wherein the enclosure] is green, the at least one button] is yellow, and the at least one widget] is blue."
+        
+        # Test marked claim.
+        linter = Linter(args)
+        marked_claim_text = linter.mark_claim_text(claim_text, 1)
+        
+        assert marked_claim_text == "A {contraption} comprising: an {enclosure}, a {display}, {at least one button}, and {at least one widget} mounted on the [enclosure], wherein the [enclosure] is green, the [at least one button] is yellow, and the [at least one widget] is blue."
+        
+        output = OutputSink()
+        marked_output = OutputSink()
+        result = Linter(args, ant_basis=True).lint("1. A widget.\n\n2. The widget of claim 1, wherein the gear is blue.\n", output=output, marked_output=marked_output)
+        assert marked_output.getvalue() == "1. A {widget}.\n\n2. The [widget] of claim 1, wherein the [gear is blue].\n\n"
+        assert len(result.warnings) > 0
+        assert output.getvalue() == "".join(warning['message']+"\n" for warning in result.warnings)
+        
+        output = OutputSink()
+        result = Linter(args, ant_basis=True, format='jsonl').lint("1. A widget.\n\n2. The widget of claim 1, wherein the gear is blue.\n", output=output)
+        assert [json.loads(line) for line in output.getvalue().splitlines()] == [dict(warning, type='warning') for warning in result.warnings]
+        assert result.warnings[-1]['rule_id'] == 'antecedent-basis' and result.warnings[-1]['location'] == claim_location(2)
+        linter = Linter(args, ant_basis=True)
+        first_result = linter.lint("1. A widget.\n\n2. The widget of claim 1, wherein the gear is blue.\n", output=OutputSink())
+        second_result = linter.lint("1. A widget.\n\n2. The widget of claim 1, wherein the gear is blue.\n", output=OutputSink())
+        assert (linter.claim_cache.hits > 0) and (first_result.warnings == second_result.warnings) and (first_result.marked_claims == second_result.marked_claims)
+        
+        claims_text = "1. A widget.\n\n2. The widget of claim 1, wherein the gear is blue.\n\n3. A gadget.\n\n4. The gadget of claim 3, wherein the lever is red.\n"
+        linter = Linter(args, ant_basis=True, no_cache=True, jobs=2)
+        assert linter.lint(claims_text, output=OutputSink()).warnings == Linter(args, ant_basis=True, no_cache=True).lint(claims_text, output=OutputSink()).warnings
+        assert linter.claim_cache is None
+        
+        # Each filter keeps its own groups, so the backreference of the second filter matches the "ss" of "possibly".
+        result = Linter(args, ant_basis=True, filter=[r"(a)\1", r"(s)\1"]).lint("1. A widget.\n\n2. The widget of claim 1, wherein the gear is blue.\n", output=OutputSink())
+        assert not('antecedent-basis' in [warning['rule_id'] for warning in result.warnings])
+        
+        result = Linter(args, ant_basis=True).lint("1. A widget.\n\n2. The widget of claim 7, wherein the gear is blue.\n", output=OutputSink())
+        assert 'parent-elements-missing' in [warning['rule_id'] for warning in result.warnings]
+        
+        # A bad message, like closing a document that isn't open or a request without its parameters, doesn't stop the language server.
+        input_stream = io.BytesIO()
+        write_message(input_stream, {'jsonrpc': '2.0', 'method': 'textDocument/didClose', 'params': {'textDocument': {'uri': 'file:///nope.txt'}}})
+        write_message(input_stream, {'jsonrpc': '2.0', 'id': 1, 'method': 'plint/lint', 'params': {}})
+        write_message(input_stream, {'jsonrpc': '2.0', 'id': 2, 'method': 'shutdown'})
+        write_message(input_stream, {'jsonrpc': '2.0', 'method': 'exit'})
+        input_stream.seek(0)
+        output_stream = io.BytesIO()
+        with contextlib.redirect_stderr(io.StringIO()):
+            assert LintServer(args, output_stream).run(input_stream) == 0
+        output_stream.seek(0)
+        responses = [read_message(output_stream) for response_number in range(3)]
+        assert responses[0]['params'] == {'uri': 'file:///nope.txt', 'diagnostics': []}
+        assert responses[1]['error']['code'] == -32603
+        assert responses[2] == {'jsonrpc': '2.0', 'id': 2, 'result': None}
+        
+        result = Linter(args, ant_basis=True, profile='').lint("1. A widget.\n\n2. The widget of claim 1, wherein the gear is substantially blue.\n", output=OutputSink())
+        report = result.profile.report()
+        assert set(stage['stage'] for stage in report['stages']) == {'other', 'claim rules', 'marking', 'antecedent basis'}
+        assert sum(rule['hits'] for rule in report['rules']) == len([warning for warning in result.warnings if warning['rule_id'].startswith('claims.csv:')]) > 0
+        assert len(report['rules']) == len(Linter(args).warnings)
+        
+        claims_text = "1. A {widget}\n   comprising a `said` gear.\n\n2. The [widget] of claim 1.\n"
+        cleaned_claim_text, offsets = claim_offsets(claims_text)[1]
+        assert cleaned_claim_text == list(parse_claims(io.StringIO(claims_text)))[0].cleaned_text
+        assert claims_text[offsets[cleaned_claim_text.index('gear')]:offsets[cleaned_claim_text.index('gear')]+4] == "gear"
+        
+        assert mpep_regex.findall("See MPEP 2144.04.V.C and MPEP 2173.05(b).") == ["2144.04.V.C", "2173.05(b)"]
+        assert len(sarif_log(result, 'claims.txt', 'spec.txt')['runs'][0]['results']) == len(result.warnings)
+        claims_text = "1. A widget.\n\n2. The widget of claim 1, wherein the\n   gear is substantially blue.\n"
+        result = Linter(args).lint(claims_text, output=OutputSink())
+        sarif_results = sarif_log(result, 'claims.txt', 'spec.txt', claims_text)['runs'][0]['results']
+        assert [sarif_result['locations'][0]['physicalLocation']['region'] for sarif_result in sarif_results if sarif_result['properties']['davKeyword'] == 'substantially'] == [{'startLine': 4, 'startColumn': 12, 'endLine': 4, 'endColumn': 25}]
+        
+        spec = SpecDocument("BACKGROUND\nThe gear is used, e.g. in cars. See FIG. 1.\n   The term gear means\na part.\n")
+        assert [spec.text[sentence_start:sentence_end] for sentence_start, sentence_end in spec.sentence_spans] == ["BACKGROUND", "The gear is used, e.g. in cars", "See FIG. 1", "The term gear means a part"]
+        assert spec.location(spec.text.index("means")) == (3, 18)
+        
+        assert ElementCounter(["gear", "gear shaft", "Shaft"]).count("A gear shaft and gears on a shaft.") == ({"gear": 2, "gear shaft": 1, "Shaft": 0}, {"gear": [2, 17], "gear shaft": [2], "Shaft": []})
+        assert ElementCounter(["gear", "gear shaft", "Shaft"], ignore_case=True, whole_words=True).count("A gear shaft and gears on a shaft.")[0] == {"gear": 1, "gear shaft": 1, "Shaft": 2}
+        assert ElementCounter(["gear"], ignore_case=True).count("\u0130\u0130 GEAR and gear.") == ({"gear": 2}, {"gear": [3, 12]})
+        
+        assert plural_starting_term_regex.sub("{", "two or more gears, the two gears, said ten gears, [one or more gears], and one or more than one spring") == "{two or more gears, the two gears, said ten gears, [one or more gears], and {one or {more than one spring"
+        
+        assert mark_element_punctuation("A {widgets!, {fully deployed,~ closed position| of a {b.", 1, "{", "}", "Curly bracket") == "A {widget}, {fully deployed, closed position} of a {b}."
+        
+        claim_text = "This is a test. `Commented out`"
+        
+        cleaned_claim_text = remove_ab_notation(claim_text)
+        
+        assert cleaned_claim_text == "This is a test."
+        
+        print('All tests passed.')
+        
+        exit()
+    
+    if not args.batch is None:
+        if not args.claims is None:
+            eprint("A claims file can not be given in batch mode.")
+            exit(1)
+        
+        exit(run_batch(args))
+    
+    if args.server:
+        exit(run_server(args))
+    
+    if args.claims is None:
+        eprint("Enter a claims file.")
+        exit(1)
+    
+    if args.watch:
+        exit(run_watch(args))
+    
+    if args.claims.endswith('.json'):
+        read_json_file(args)
+    
+    if args.debug:
+        print(args)
+        print("Reading {}...".format(args.claims))
+    
+    if args.claims_warnings is None:
+        args.claims_warnings = default_warnings_file('claims')
+    
+    error_message = check_input_files(args)
+    if not error_message is None:
+        eprint(error_message)
+        sys.exit(1)
+    
+    linter = Linter(args)
+    
+    if args.spec is None:
+        spec = None
+    else:
+        with open(args.spec, "r", encoding="utf-8") as spec_file:
+            spec = spec_file.read()
+    
+    # The claims are read from the file as they are checked.
+    with open(args.claims) as claim_file:
+        result = linter.lint(claim_file, spec=spec, title=args.title, claims_file=args.claims)
+    
+    print_summary(result)
+    
+    if not(args.profile is None):
+        if args.profile == '':
+            args.profile = args.claims+'.profile.json'
+        
+        result.profile.print_report(args.profile)
+    
+    exit(result.exit_status())
 
-if number_of_warnings > 0:
-    exit(2)
+if __name__ == "__main__":
+    main()